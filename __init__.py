@@ -1,11 +1,12 @@
 import os
 from werkzeug.routing import PathConverter
 from flask import (
-   Flask, redirect, render_template,
+   Flask, jsonify, redirect, render_template,
    request, send_from_directory, url_for
 )
-from .lookup import lookup, random_key
+from .lookup import did_you_mean, lookup, random_key, suggest
 from .lookup.charutils import roman
+from .lookup.data import watch
 from .lookup.table import Multitable
 
 class Query(PathConverter):
@@ -15,6 +16,9 @@ app = Flask(__name__)
 
 app.url_map.converters["query"] = Query
 
+if os.environ.get("JEZIK_WATCH"):
+   watch() # pick up edits of data.yml without a restart
+
 @app.route("/")
 def index():
    return render_template("index.html")
@@ -27,7 +31,8 @@ def results(word):
    output_yat = request.args.get("out") or "e"
    par = request.args.get("par") or None
    subpar = request.args.get("subpar") or None
-   tables = lookup(word, input_yat, output_yat)
+   # all forms are shown, so they are computed at once
+   tables = lookup(word, input_yat, output_yat, lazy=False)
 
    if par:
       tables = [t for t in tables if t.caption.par == par]
@@ -45,9 +50,16 @@ def results(word):
          "results.html",
          tables=tables,
          input_yat=input_yat,
-         output_yat=output_yat
+         output_yat=output_yat,
+         suggestions=[] if tables else did_you_mean(word, input_yat)
       )
 
+@app.route("/suggest")
+def suggestions():
+   query = request.args.get("q") or ""
+   input_yat = request.args.get("in") or "e"
+   return jsonify(suggest(query, input_yat))
+
 @app.errorhandler(404)
 def page_not_found(_):
    return render_template("404.html"), 404
@@ -0,0 +1,69 @@
+# This file is a tool intended to be run from the terminal as
+# `python -m jezik.benchmarks.allocations` from outside the `jezik` directory.
+# It measures how much memory a lookup allocates: the peak while the
+# tables are generated and what the finished tables keep, and how big
+# the objects that every lookup creates are.
+
+import gc
+import sys
+import tracemalloc
+from typing import Any
+from ..lookup import lookup, set_paradigm_cache_size, data
+from ..lookup.paradigm_helpers import AccentedTuple, i_to_accents
+from ..lookup.pos import part_of_speech
+from ..lookup.utils import set_expose_cache_size
+
+def instance_size(obj:Any) -> int:
+   """The size of `obj` with its __dict__ if it has one, not counting the values"""
+   return sys.getsizeof(obj) + (sys.getsizeof(vars(obj)) if hasattr(obj, "__dict__") else 0)
+
+def snapshot() -> tracemalloc.Snapshot:
+   """Without the memory of tracemalloc itself, e.g. of earlier snapshots"""
+   return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+if __name__ == '__main__':
+   multitable = lookup("адвокат", lazy=False)
+   table = next(iter(multitable))
+   inner_key, entry = next(data["адвокат", "e"])
+   POS = part_of_speech(entry.type)
+   assert POS is not None
+   word = POS(
+      inner_key, entry.accented_keys, entry.type, entry.info,
+      entry.replacements, entry.amendments
+   )
+   print('Bytes per object:')
+   for obj in (
+      word, word.gram, multitable, table, table._cells, table.caption,
+      AccentedTuple("а", "a:"), i_to_accents("1@2:")
+   ):
+      print(f'   {type(obj).__name__}: {instance_size(obj)}')
+
+   keys = [
+      key for key, yat in list(data.get()._outer_to_inner._data)[::50]
+      if yat == "e"
+   ]
+   # nothing is remembered, so that every lookup generates its paradigms
+   set_paradigm_cache_size(0)
+   set_expose_cache_size(0)
+   for key in keys: # everything that is built once, e.g. compiled endings
+      list(lookup(key, lazy=False))
+   gc.collect()
+   tracemalloc.start()
+   peaks = 0
+   kept_blocks = 0
+   kept_bytes = 0
+   for key in keys:
+      before = snapshot()
+      start = tracemalloc.get_traced_memory()[0]
+      tracemalloc.reset_peak()
+      tables = list(lookup(key, lazy=False))
+      peaks += tracemalloc.get_traced_memory()[1] - start
+      gc.collect()
+      for stat in snapshot().compare_to(before, "filename"):
+         kept_blocks += stat.count_diff
+         kept_bytes += stat.size_diff
+      del tables
+   tracemalloc.stop()
+   print(f'{len(keys)} lookups, on average:')
+   print(f'   peak while generating: {peaks / len(keys) / 1024:.1f} KiB')
+   print(f'   kept by the tables: {kept_blocks / len(keys):.0f} blocks, {kept_bytes / len(keys) / 1024:.1f} KiB')
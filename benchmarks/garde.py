@@ -0,0 +1,21 @@
+# This file is a tool intended to be run from the terminal as
+# `python -m jezik.benchmarks.garde` from outside the `jezik` directory.
+# It measures how long `garde` takes on all keys in the dictionary.
+
+from timeit import timeit
+from ..lookup.data import data
+from ..lookup.paradigm_helpers import accentize
+from ..lookup.utils import garde
+from ..tests.legacy import garde as legacy_garde
+
+if __name__ == '__main__':
+   words = [
+      accentize(key)
+      for inner_key in data._inner_to_entries
+      for entry in data.entries(inner_key)
+      for key in entry.accented_keys.split(",")
+   ]
+   print(f'garde on {len(words)} keys:')
+   for name, function in (('regex per position (old)', legacy_garde), ('list of chars', garde)):
+      t = timeit(lambda: [function(word) for word in words], number=5) / 5
+      print(f'   {name}: {t*1000:.1f} ms, {t/len(words)*1e6:.1f} us per key')
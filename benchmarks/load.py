@@ -0,0 +1,67 @@
+# This file is a tool intended to be run from the terminal as
+# `python -m jezik.benchmarks.load` from outside the `jezik` directory.
+# It measures how long it takes to build the dictionary.
+
+import os
+from time import perf_counter
+from timeit import timeit
+from typing import List, Tuple
+import yaml
+from ..lookup.data import build as build_in_processes, file_path, parse
+from ..lookup.data.multidict import FancyLookup, Multidict, inner_to_outer
+
+def fill(pairs:List[Tuple[Tuple[str, str], str]], bulk:bool) -> Multidict:
+   result = Multidict[Tuple[str, str], str]()
+   if bulk:
+      with result.bulk():
+         for key, value in pairs:
+            result[key] = value
+   else:
+      for key, value in pairs:
+         result[key] = value
+   return result
+
+def build(entries, bulk:bool) -> FancyLookup:
+   result = FancyLookup()
+   if bulk:
+      with result.bulk():
+         for inner_key, entry in entries:
+            result[inner_key] = entry
+   else:
+      for inner_key, entry in entries:
+         result[inner_key] = entry
+   return result
+
+if __name__ == '__main__':
+   with open(file_path, encoding="utf-8") as f:
+      entries = list(parse(yaml.safe_load(f)))
+   pairs = [
+      (outer, inner_key)
+      for inner_key, entry in entries
+      for outer in inner_to_outer(entry.accented_keys, entry.extra_key)
+   ]
+   assert fill(pairs, False)._data == fill(pairs, True)._data
+
+   # in data.yml, keys rarely have more than two values, so we also
+   # measure keys shared by many values, which is where bulk mode matters
+   crowded_pairs = [((str(i % 50), "e"), str(i)) for i in range(len(pairs))]
+
+   for name, some_pairs in (
+      ('the outer-to-inner index', pairs),
+      ('50 keys with many values each', crowded_pairs)
+   ):
+      print(f'{len(some_pairs)} insertions into {name}:')
+      for bulk in (False, True):
+         t = timeit(lambda: fill(some_pairs, bulk), number=5) / 5
+         print(f'   bulk={bulk}: {t*1000:.1f} ms')
+   print('Whole FancyLookup:')
+   for bulk in (False, True):
+      t = timeit(lambda: build(entries, bulk), number=3) / 3
+      print(f'   bulk={bulk}: {t*1000:.1f} ms')
+   print('Whole FancyLookup from data.yml, in parallel:')
+   workers = 1
+   while workers <= 2 * (os.cpu_count() or 1):
+      start = perf_counter()
+      build_in_processes(workers=workers)
+      print(f'   workers={workers}: {(perf_counter() - start)*1000:.1f} ms')
+      workers *= 2
@@ -0,0 +1,58 @@
+# This file is a tool intended to be run from the terminal as
+# `python -m jezik.benchmarks.memory` from outside the `jezik` directory.
+# It measures how much memory the dictionary takes with interned strings
+# (see FancyLookup.add) and with a separate copy of every string.
+
+import gc
+import pickle
+import tracemalloc
+from typing import Callable, List, Tuple
+from ..lookup.data import outer_keys, parse, read
+from ..lookup.data.multidict import Entry, FancyLookup
+
+def plain(pairs:List[Tuple[str, Entry]], keys:List[List[Tuple[str, str]]]) -> FancyLookup:
+   """Filled without interning, i.e. like FancyLookup.add used to do it"""
+   result = FancyLookup()
+   with result.bulk():
+      for (inner_key, entry), entry_keys in zip(pairs, keys):
+         result._inner_to_entries[inner_key] = entry
+         for key_with_mode in entry_keys:
+            result._outer_to_inner[key_with_mode] = inner_key
+   return result
+
+def interned(pairs:List[Tuple[str, Entry]], keys:List[List[Tuple[str, str]]]) -> FancyLookup:
+   result = FancyLookup()
+   with result.bulk():
+      for (inner_key, entry), entry_keys in zip(pairs, keys):
+         result.add(inner_key, entry, entry_keys)
+   return result
+
+def footprint(make:Callable[[], FancyLookup]) -> Tuple[FancyLookup, int]:
+   """The result of `make` and how many bytes it has allocated and kept"""
+   gc.collect()
+   before = tracemalloc.get_traced_memory()[0]
+   result = make()
+   gc.collect()
+   return result, tracemalloc.get_traced_memory()[0] - before
+
+if __name__ == '__main__':
+   pairs = list(parse(read()))
+   keys = outer_keys([entry for _, entry in pairs])
+   tracemalloc.start()
+   for name, fill in (('plain', plain), ('interned', interned)):
+      # from a copy, so that the strings aren't shared between the two
+      built, built_size = footprint(lambda: fill(*pickle.loads(pickle.dumps((pairs, keys)))))
+      snapshot = pickle.dumps(built, pickle.HIGHEST_PROTOCOL)
+      del built
+      loaded, loaded_size = footprint(lambda: pickle.loads(snapshot))
+      entries = [e for inner_key in loaded._inner_to_entries for e in loaded.entries(inner_key)]
+      print(f'{name}:')
+      print(f'   built: {built_size / 2**20:.1f} MiB')
+      print(f'   loaded from a snapshot: {loaded_size / 2**20:.1f} MiB')
+      print(f'   snapshot: {len(snapshot) / 2**20:.2f} MiB')
+      for field in ("type", "info", "caption"):
+         values = [getattr(e, field) for e in entries]
+         print(f'   {field}: {len({id(v) for v in values})} objects for {len(set(values))} values')
+      outer = [outer_key for outer_key, _ in loaded._outer_to_inner]
+      print(f'   outer keys: {len({id(k) for k in outer})} objects for {len(set(outer))} values')
+      del loaded, entries, outer
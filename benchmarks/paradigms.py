@@ -0,0 +1,36 @@
+# This file is a tool intended to be run from the terminal as
+# `python -m jezik.benchmarks.paradigms` from outside the `jezik` directory.
+# It measures how long generating paradigms takes for every part of speech,
+# without exposing the forms and with it (with the expose cache turned off).
+
+from timeit import repeat
+from typing import Dict, List
+from ..lookup.data import data
+from ..lookup.pos import PartOfSpeech, part_of_speech
+from ..lookup.utils import set_expose_cache_size, expose_cache_size
+
+if __name__ == '__main__':
+   words: Dict[str, List[PartOfSpeech]] = {}
+   for inner_key in list(data._inner_to_entries)[::3]:
+      for entry in data.entries(inner_key):
+         POS = part_of_speech(entry.type)
+         if POS is not None:
+            words.setdefault(POS.__name__, []).append(POS(
+               inner_key, entry.accented_keys, entry.type, entry.info,
+               entry.replacements, entry.amendments
+            ))
+   set_expose_cache_size(0)
+   for name, pos_words in sorted(words.items()):
+      # the best of several runs, the others are mostly noise
+      generated = min(repeat(
+         lambda: [list(word._raw_multiforms()) for word in pos_words], number=1, repeat=7
+      ))
+      exposed = min(repeat(
+         lambda: [list(word.multiforms()) for word in pos_words], number=1, repeat=7
+      ))
+      print(
+         f'{name} ({len(pos_words)} words): generating {generated*1000:.0f} ms, '
+         f'with exposing {exposed*1000:.0f} ms, '
+         f'{exposed/len(pos_words)*1e6:.0f} us per word'
+      )
+   set_expose_cache_size(expose_cache_size)
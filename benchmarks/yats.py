@@ -0,0 +1,30 @@
+# This file is a tool intended to be run from the terminal as
+# `python -m jezik.benchmarks.yats` from outside the `jezik` directory.
+# It measures how long it takes to look words up in all three yat modes,
+# one lookup per yat mode and with `lookup_all_yats`.
+
+from timeit import timeit
+from ..lookup import lookup, lookup_all_yats, set_paradigm_cache_size, data
+from ..lookup.utils import set_expose_cache_size
+
+if __name__ == '__main__':
+   keys = [
+      key for key, yat in list(data.get()._outer_to_inner._data)[::50]
+      if yat == "e"
+   ]
+   yats = ("e", "je", "ije")
+   # nothing is remembered, so that every lookup generates its paradigms
+   set_paradigm_cache_size(0)
+   set_expose_cache_size(0)
+   print(f'{len(keys)} words in all yat modes:')
+   # repr needs every form, so that lazy tables are computed too
+   t = timeit(lambda: [
+      repr(lookup(key, "e", yat, lazy=False)) for key in keys for yat in yats
+   ], number=1)
+   print(f'   three lookups: {t*1000:.0f} ms')
+   t = timeit(lambda: [
+      repr(multitable) for key in keys for multitable in lookup_all_yats(key, "e", yats).values()
+   ], number=1)
+   print(f'   lookup_all_yats: {t*1000:.0f} ms')
+   t = timeit(lambda: [repr(lookup(key, "e", "e", lazy=False)) for key in keys], number=1)
+   print(f'   (a single lookup: {t*1000:.0f} ms)')
@@ -23,7 +23,7 @@ if __name__ == "__main__":
 
    def f():
       doc = QTextDocument()
-      tables = lookup(line.text())
+      tables = lookup(line.text(), lazy=False) # all forms are shown
       doc.setHtml(template.render(
          request={"script_root":""},
          tables=tables,
@@ -1,78 +1,303 @@
 
-from typing import Dict, Iterator, Optional, Tuple, Type, Union
-from .adjective import Adjective
-from .adverb import Adverb
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from .cache import CacheInfo, LRUCache
 from .charutils import all_latin
-from .data import data
-from .noun import Noun
-from .table import Table, Multitable
-from .paradigm_helpers import has, make_caption
+from .data import data, load_form_index, load_paradigm_store
+from .data.multidict import Entry
+from .table import Cells, LabeledMultiform, Multiform, Table, Multitable, to_latin
+from .paradigm_helpers import LabelFilter, has, make_caption
+from .pos import PartOfSpeech, all_parts_of_speech, part_of_speech
 from .utils import strip_suffix
-from .verb import Verb
 
 
-PartOfSpeech = Union[
-   Type[Verb],
-   Type[Adjective],
-   Type[Noun],
-   Type[Adverb]
-]
+Paradigm = List[LabeledMultiform]
 
-def part_of_speech(kind:str) -> Optional[PartOfSpeech]:
-   POS = kind.split('\\')[0]
-   # TODO: it gets calculated doubly here and inside concrete classes, rethink
+def _paradigm_size(paradigm:Paradigm) -> int:
+   """Approximately how many bytes `paradigm` takes"""
+   return sys.getsizeof(paradigm) + sum(
+      sys.getsizeof(label) + sys.getsizeof(forms) + sum(sys.getsizeof(f) for f in forms)
+      for label, forms in paradigm
+   )
 
-   if POS == "V":
-      return Verb
-   if POS == "A":
-      return Adjective
-   if POS == "N":
-      return Noun
-   if POS == "B":
-      return Adverb
-   return None # TODO other parts of speech
+# Finished paradigms by (data version, inner key, entry index, variant, yat),
+# always in Cyrillic: Latin tables are transliterated from them, so that both
+# scripts share the cache. The data version changes when the dictionary is reloaded, so paradigms of the
+# old dictionary are never used again and are evicted eventually.
+_paradigm_cache: LRUCache[Tuple[int, str, int, int, str], Paradigm] = LRUCache(
+   maxsize=None, maxbytes=16 << 20, sizeof=_paradigm_size
+)
 
-def lazy_lookup(key:str, input_yat:str, output_yat:str) -> Iterator[Table]:
+def set_paradigm_cache_size(maxbytes:int) -> None:
+   """
+   Sets approximately how many bytes the paradigm cache may take
+   (0 turns it off). Clears the cache.
+   """
+   global _paradigm_cache
+   _paradigm_cache = LRUCache(maxsize=None, maxbytes=maxbytes, sizeof=_paradigm_size)
 
-   if input_yat not in ["e", "ije"] or output_yat not in ["e", "je", "ije"]:
+def paradigm_cache_info() -> CacheInfo:
+   """Hits, misses, evictions and size of the paradigm cache"""
+   return _paradigm_cache.cache_info()
+
+def _copy(paradigm:Paradigm) -> Paradigm:
+   """A copy for a table, so that changing the table doesn't change the cache"""
+   return [(label, list(forms)) for label, forms in paradigm]
+
+def _cached_paradigm(cache_key:Tuple[int, str, int, int, str]) -> Optional[Paradigm]:
+   """
+   The paradigm from the cache or, if it isn't there, from the store of
+   precomputed paradigms (see data.paradigm_store). None if it has to be generated.
+   """
+   paradigm = _paradigm_cache.get(cache_key)
+   if paradigm is None:
+      store = load_paradigm_store()
+      if store is not None:
+         _, inner_key, entry_index, variant, yat = cache_key
+         paradigm = store.get(inner_key, entry_index, variant, yat)
+         if paradigm is not None:
+            _paradigm_cache[cache_key] = paradigm
+   return paradigm
+
+def _lazy_cells(
+   word:PartOfSpeech,
+   variant:int,
+   yat:str,
+   latin:bool,
+   cache_key:Tuple[int, str, int, int, str]
+) -> Cells:
+   """
+   Cells that expose only the forms that are asked for. The paradigm
+   is put into the cache once all of it has been exposed.
+   """
+   raw = word.raw_multiforms(variant)
+   exposed: Dict[int, LabeledMultiform] = {}
+
+   def compute(indices:List[int]) -> List[Multiform]:
+      multiforms = word.expose_raw([raw[i] for i in indices], (yat,))[yat]
+      exposed.update(zip(indices, multiforms))
+      if len(exposed) == len(raw):
+         _paradigm_cache[cache_key] = [exposed[i] for i in range(len(raw))]
+      if latin:
+         return [forms for _, forms in to_latin(multiforms)]
+      return [forms for _, forms in _copy(multiforms)]
+
+   return Cells([multiform.label for multiform in raw], compute)
+
+def _tables(
+   inner_key:str,
+   entry:Entry,
+   entry_index:int,
+   output_yats:Sequence[str],
+   latin:bool,
+   version:int,
+   found_as:Optional[Dict[int, List[str]]]=None,
+   lazy:bool=False,
+   forms:Optional[Sequence[str]]=None
+) -> Iterator[Dict[str, Table]]:
+   """
+   Yields tables for every variant of the entry, one per yat mode.
+   If `found_as` is given, only for the variants in it, and the labels
+   from it are added to captions. `entry_index` and `version` identify
+   the entry in the paradigm cache and store. With `lazy` and a single yat mode,
+   the forms of a table are only exposed when they are asked for.
+   With `forms`, only the cells with matching labels are generated (see
+   LabelFilter); such partial paradigms are taken from the cache but never
+   put into it.
+   """
+   wanted = LabelFilter(forms)
+   caption, accented_keys, _, kind, info, replacements, amendments = entry
+   POS = part_of_speech(kind)
+   if POS:
+      word = POS(inner_key, accented_keys, kind, info, replacements, amendments)
+      # # TODO: can we avoid passing kind and info again? POS already knows
+      n_variants = len(word.accented_keys)
+      for i in range(n_variants):
+         if found_as is not None and i not in found_as:
+            continue
+         full_caption = make_caption(caption, n_variants, i)
+         if found_as is not None:
+            full_caption.full_caption += f" [{', '.join(found_as[i])}]"
+         paradigms: Dict[str, Paradigm] = {}
+         for yat in output_yats:
+            paradigm = _cached_paradigm((version, inner_key, entry_index, i, yat))
+            if paradigm is not None:
+               paradigms[yat] = [cell for cell in paradigm if wanted(cell[0])]
+         missing = [yat for yat in output_yats if yat not in paradigms]
+         if missing and forms is not None:
+            # only a few cells, so they are generated right away
+            paradigms.update(word.multiforms_by_yat(variant=i, yats=missing, forms=forms))
+            missing = []
+         if missing and lazy and len(output_yats) == 1:
+            yat = output_yats[0]
+            cache_key = (version, inner_key, entry_index, i, yat)
+            yield {yat: Table(
+               POS.__name__.lower(), full_caption, _lazy_cells(word, i, yat, latin, cache_key)
+            )}
+            continue
+         if missing:
+            # the paradigm is generated once for all the missing yat modes
+            for yat, paradigm in word.multiforms_by_yat(variant=i, yats=missing).items():
+               _paradigm_cache[(version, inner_key, entry_index, i, yat)] = paradigm
+               paradigms[yat] = paradigm
+         yield {
+            yat: Table(
+               POS.__name__.lower(),
+               full_caption,
+               to_latin(paradigms[yat]) if latin else _copy(paradigms[yat])
+            )
+            for yat in output_yats
+         }
+   else:
+      table = Table(
+         "",
+         make_caption(("", ""), 1, 1),
+         iter([("😞", ["Још не знамо како се акцентује ова реч"])])
+      )
+      yield {yat: table for yat in output_yats}
+      # # TODO, and also sometimes ријеч and/or latin
+
+def _lazy_lookup(
+   key:str,
+   input_yat:str,
+   output_yats:Sequence[str],
+   lazy:bool=False,
+   forms:Optional[Sequence[str]]=None
+) -> Iterator[Dict[str, Table]]:
+
+   if input_yat not in ["e", "ije"] or any(y not in ["e", "je", "ije"] for y in output_yats):
       return # TODO: nice error message, this would only lead to "word not found"
 
    latin = has(key, *tuple(all_latin))
 
    key, with_se = strip_suffix(key, (" se", " се"))
 
-   for inner_key, values in data[key, input_yat]:
-      caption, accented_keys, _, kind, info, replacements, amendments = values
-      POS = part_of_speech(kind)
-      # # TODO: we have a rather different POS variable in part_of_speech, make it a dict there
-      if with_se and ((POS is not Verb) or (POS is Verb and not 'Refl' in kind)):
+   # the same dictionary for the whole lookup even if it's reloaded meanwhile
+   version, dictionary = data.versioned()
+
+   found = False
+   for inner_key, entry in dictionary[key, input_yat]:
+      if with_se and not (entry.type.startswith("V") and 'Refl' in entry.type):
          continue # for skipping meaningless queries like "адвокат се"
-      elif POS:
-         word = POS(inner_key, accented_keys, kind, info, replacements, amendments)
-         # # TODO: can we avoid passing kind and info again? POS already knows
-         n_variants = len(word.accented_keys)
-         for i in range(n_variants):
-            full_caption = make_caption(caption, n_variants, i)
-            yield Table(
-               POS.__name__.lower(),
-               full_caption,
-               word.multiforms(variant=i, yat=output_yat, latin=latin)
-            )
-      else:
-         yield Table(
-            "",
-            make_caption(("", ""), 1, 1),
-            iter([("😞", ["Још не знамо како се акцентује ова реч"])])
-         )
-         # # TODO, and also sometimes ријеч and/or latin
-
-def lookup(outer_key:str, input_yat:str="e", output_yat:Optional[str]=None) -> Multitable:
+      found = True
+      entry_index = dictionary.entries(inner_key).index(entry)
+      yield from _tables(
+         inner_key, entry, entry_index, output_yats, latin, version,
+         lazy=lazy, forms=forms
+      )
+   if found:
+      return
+
+   # the key isn't a lemma, but it can be an inflected form, e.g. људи
+   found_as: Dict[Tuple[str, int], Dict[int, List[str]]] = {}
+   for hit in load_form_index()[key, input_yat]:
+      labels = found_as.setdefault((hit.inner_key, hit.entry_index), {})
+      labels.setdefault(hit.variant, []).append(hit.label)
+   for (inner_key, entry_index), variants in found_as.items():
+      entries = dictionary.entries(inner_key)
+      if entry_index >= len(entries):
+         continue # the index is older than the dictionary
+      entry = entries[entry_index]
+      if with_se and not (entry.type.startswith("V") and 'Refl' in entry.type):
+         continue
+      yield from _tables(
+         inner_key, entry, entry_index, output_yats, latin, version, variants, lazy, forms
+      )
+
+def lazy_lookup(
+   key:str,
+   input_yat:str,
+   output_yat:str,
+   lazy:bool=True,
+   forms:Optional[Sequence[str]]=None
+) -> Iterator[Table]:
+   for tables in _lazy_lookup(key, input_yat, (output_yat,), lazy, forms):
+      yield tables[output_yat]
+
+def lookup(
+   outer_key:str,
+   input_yat:str="e",
+   output_yat:Optional[str]=None,
+   lazy:bool=True,
+   forms:Optional[Sequence[str]]=None
+) -> Multitable:
+   """
+   All tables of `outer_key`. With `lazy`, the forms of a table are only
+   computed when they are asked for, e.g. `lookup("адвокат")["sg nom"]`
+   only computes one form. Without it, all forms are computed right away,
+   which is faster if all of them are going to be shown.
+   With `forms`, e.g. `["sg nom", "pl gen"]`, the tables only contain the
+   forms whose labels contain all words of one of the queries, and only
+   those forms are generated.
+   """
    if output_yat is None:
       output_yat = input_yat
    if input_yat == "je":
       input_yat = "ije"
    outer_key = outer_key.strip() # space-word-space will produce a search error otherwise
-   return Multitable(outer_key, lazy_lookup(outer_key, input_yat, output_yat))
+   return Multitable(outer_key, lazy_lookup(outer_key, input_yat, output_yat, lazy, forms))
+
+def lookup_all_yats(
+   outer_key:str,
+   input_yat:str="e",
+   output_yats:Sequence[str]=("e", "je", "ije")
+) -> Dict[str, Multitable]:
+   """
+   The same as `{yat: lookup(outer_key, input_yat, yat, lazy=False) for yat in output_yats}`,
+   but every paradigm is generated only once, so it costs about as much as
+   a single lookup. Unlike `lookup`, it is never lazy: all tables of all
+   yat modes are generated before it returns, since each paradigm is
+   generated for all of them at once.
+   """
+   if input_yat == "je":
+      input_yat = "ije"
+   outer_key = outer_key.strip()
+   found = list(_lazy_lookup(outer_key, input_yat, output_yats))
+   return {
+      yat: Multitable(outer_key, [tables[yat] for tables in found])
+      for yat in output_yats
+   }
+
+def suggest(prefix:str, input_yat:str="e", limit:int=10) -> List[str]:
+   """Words that start with `prefix`, for autocompletion"""
+   if input_yat == "je":
+      input_yat = "ije"
+   prefix = prefix.strip()
+   if not prefix:
+      return []
+   return data.suggest(prefix, input_yat, limit)
+
+def did_you_mean(
+   word:str,
+   input_yat:str="e",
+   limit:int=5,
+   time_budget:float=0.02
+) -> List[str]:
+   """
+   Words that `word` may be a misspelling of. Meant to be called only
+   when `lookup` finds nothing, and never takes much more than `time_budget`
+   seconds. Finds nothing until its index has been built, see `preload`.
+   """
+   if input_yat == "je":
+      input_yat = "ije"
+   word = word.strip()
+   if not word:
+      return []
+   return data.similar(word, input_yat, limit, time_budget)
+
+def random_key(
+   by:str="outer",
+   pos_weights:Optional[Dict[str, float]]=None
+) -> Tuple[str, str]:
+   """A random (outer key, yat mode) pair, see FancyLookup.random_key"""
+   return data.random_key(by, pos_weights)
 
-def random_key() -> Tuple[str, str]:
-   return data.random_key()
+def preload() -> None:
+   """
+   Loads the dictionary and all parts of speech and builds the index
+   for `did_you_mean` right away. Otherwise they are loaded on first use,
+   which makes the first lookup slow and `did_you_mean` find nothing
+   until its index has been built in the background.
+   """
+   data.get().prepare_similar()
+   all_parts_of_speech()
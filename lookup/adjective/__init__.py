@@ -1,10 +1,9 @@
 from typing import Dict, List, Iterator, Optional, Tuple
 import re
-from ..table import LabeledMultiform
-from ..pos import PartOfSpeech, Replacement
-from ..utils import insert, garde, expose, last_vowel_index, expose_replacement
-from ..paradigm_helpers import AccentedTuple, nice_name, oa, accentize, uniq
-from .paradigms import AdjParadigm, short_adj, long_adj, mixed_adj
+from ..pos import PartOfSpeech, RawMultiform, Replacement
+from ..utils import insert, garde, last_vowel_index
+from ..paradigm_helpers import AccentedTuple, LabelFilter, oa, accentize
+from .paradigms import compiled_adj_endings
 from ..charutils import cmacron, cstraight
 
 adj_AP_pairs = (
@@ -33,7 +32,11 @@ adj_AP_pairs = (
 
 adj_AP_to_inner_AP = {b:a for a,b in adj_AP_pairs}
 
+_impossible_adj_form = re.compile('[њљћђшжчџјʲ]œ.+ме$')
+
 class Adjective(PartOfSpeech):
+   __slots__ = ("short_AP", "long_AP", "trunk")
+
    def __init__(
       self,
       key:str,
@@ -50,11 +53,6 @@ class Adjective(PartOfSpeech):
 
       self.trunk = self._trunk()
 
-   # different
-   @staticmethod
-   def _expose(form:str, yat:str="e", latin:bool=False) -> str:
-      return expose(form, yat, latin)
-
    # different for Verb and Adjective
    def _trunk(self) -> List[str]:
       result = []
@@ -85,22 +83,22 @@ class Adjective(PartOfSpeech):
    # Adjective-specific. Verb has its own
    @staticmethod
    def _adj_form_is_possible(adj_form:str) -> bool:
-      return re.search('[њљћђшжчџјʲ]œ.+ме$', adj_form) is None
+      return _impossible_adj_form.search(adj_form) is None
 
    # Adjective-only. Verb should have its own one
    def _paradigm_to_forms(
       self,
-      paradigm:AdjParadigm,
+      paradigm:str,
       i:int,
       length_inconstant:bool,
-      yat:str="e",
-      latin:bool=False
-   ) -> Iterator[LabeledMultiform]:
+      wanted:LabelFilter=LabelFilter()
+   ) -> Iterator[RawMultiform]:
       """
-      Current subparadigm: short or long AP (they behave differently)
+      Current subparadigm: short or long AP (they behave differently),
+      a key of adj_paradigms
       i: index of the variation (by variation we mean things like зу̑бнӣ зу́бнӣ)
       """
-      current_AP = self.short_AP[i] if paradigm is short_adj else self.long_AP[i]
+      current_AP = self.short_AP[i] if paradigm == "short" else self.long_AP[i]
 
       adj_form = self.swap(
          trunk=self.trunk[i],
@@ -109,55 +107,46 @@ class Adjective(PartOfSpeech):
          target_AP=self.short_AP[i]
       )
 
-      for label, ending in zip(paradigm._fields, paradigm):
+      for label, name, chains in compiled_adj_endings(paradigm, current_AP):
+
+         if not wanted(name):
+            continue
 
-         if label in self.replacements:
-            result = [
-               expose_replacement(w_form, yat, latin) 
-               for w_form in self.replacements[label]
-            ]
-            yield nice_name(label), uniq(result)
+         elif label in self.replacements:
+            yield RawMultiform(name, [], [], self.replacements[label])
 
          else:
             ready_forms: List[str] = []
-            for variation in ending: # e.g. -om, -ome, -omu
+            for variation in chains: # e.g. -om, -ome, -omu
                if 'ʟ' in adj_form:
                   adj_variants = [adj_form.replace('ʟ', 'ʌ'), adj_form.replace('ʟ', 'л')]
                else:
                   adj_variants = [adj_form]
                for adj_variant in adj_variants:
-                  if self._adj_form_is_possible(adj_variant + variation.morpheme):
+                  if self._adj_form_is_possible(adj_variant + variation.morphemes[0].morpheme):
                      ready_forms += self.process_one_form(
                         current_AP=current_AP,
                         stem=adj_variant,
-                        morphChain=[variation],
+                        morphChain=variation.morphemes,
                         iterative=False
                      )
 
-            if label in self.amendments:
-               ready_forms += [
-                  expose_replacement(w_form, yat, latin)
-                  for w_form in self.amendments[label]
-               ]
-            result = [self._expose(w_form, yat, latin) for w_form in ready_forms]
-            yield nice_name(label), uniq(result)
+            yield RawMultiform(name, ready_forms, self.amendments.get(label, []))
 
-   def multiforms(
+   def _raw_multiforms(
       self,
-      *,
       variant:Optional[int]=None,
-      yat:str="e",
-      latin:bool=False
-   ) -> Iterator[LabeledMultiform]:
+      wanted:LabelFilter=LabelFilter()
+   ) -> Iterator[RawMultiform]:
       """decline"""
       endings = self.gram.other[0]
-      MPs: List[AdjParadigm]
+      MPs: List[str]
       if endings == "all":
-         MPs = [short_adj, long_adj]
+         MPs = ["short", "long"]
       elif endings == "ski":
-         MPs = [long_adj]
+         MPs = ["long"]
       elif endings == "ov":
-         MPs = [mixed_adj]
+         MPs = ["mixed"]
 
       for i, AP in enumerate(self.gram.AP):
          # variant = None means all variants
@@ -168,10 +157,4 @@ class Adjective(PartOfSpeech):
                if self.short_AP[i][-1] != self.long_AP[i][-1]:
                   length_inconstant = True
             for paradigm in MPs:
-               yield from self._paradigm_to_forms(
-                  paradigm,
-                  i, 
-                  length_inconstant,
-                  yat,
-                  latin
-               )
+               yield from self._paradigm_to_forms(paradigm, i, length_inconstant, wanted)
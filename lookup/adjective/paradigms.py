@@ -1,5 +1,6 @@
-from typing import NamedTuple, List, Union
-from ..paradigm_helpers import AccentedTuple
+from functools import lru_cache
+from typing import Dict, NamedTuple, List, Tuple, Union
+from ..paradigm_helpers import AccentedTuple, CompiledEnding, compile_endings
 from ..charutils import cmacron
 
 # TODO: why is this organized so differently from nouns and verbs? unify and/or document
@@ -209,3 +210,19 @@ mixed_adj = MixedAdj(
   m_f_n_pl_dat_loc_ins_long = long_adj.m_f_n_pl_dat_loc_ins_long)
 
 AdjParadigm = Union[ShortAdj, LongAdj, MixedAdj]
+
+adj_paradigms: Dict[str, AdjParadigm] = {
+   "short": short_adj,
+   "long": long_adj,
+   "mixed": mixed_adj
+}
+
+@lru_cache(maxsize=None)
+def compiled_adj_endings(paradigm:str, AP:str) -> Tuple[CompiledEnding, ...]:
+   """`paradigm` is a key of adj_paradigms"""
+   return compile_endings(
+      # every variation is a chain of one morpheme
+      ((label, [[variation] for variation in ending])
+       for label, ending in zip(adj_paradigms[paradigm]._fields, adj_paradigms[paradigm])),
+      AP
+   )
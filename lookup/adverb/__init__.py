@@ -1,10 +1,11 @@
 from typing import Iterator, Optional, Tuple
-from ..pos import PartOfSpeech, Replacement
-from ..utils import garde, expose
-from ..paradigm_helpers import uniq, nice_name, accentize
-from ..table import LabeledMultiform
+from ..pos import PartOfSpeech, RawMultiform, Replacement
+from ..utils import garde
+from ..paradigm_helpers import LabelFilter, accentize
 
 class Adverb(PartOfSpeech): #TODO majority of these can probably be moved to POS?
+   __slots__ = ()
+
    def __init__(
       self,
       key:str,
@@ -16,19 +17,15 @@ class Adverb(PartOfSpeech): #TODO majority of these can probably be moved to POS
    ) -> None:
       super().__init__(key, accented_keys, kind, info, replacements, amendments)
 
-   @staticmethod
-   def _expose(form:str, yat:str="e", latin:bool=False) -> str:
-      return expose(form, yat, latin)
-
-   def multiforms(
+   def _raw_multiforms(
       self,
-      *,
-      variant:Optional[int] = None,
-      yat:str="e",
-      latin:bool=False
-   ) -> Iterator[LabeledMultiform]:
+      variant:Optional[int]=None,
+      wanted:LabelFilter=LabelFilter()
+   ) -> Iterator[RawMultiform]:
+      if not wanted(""):
+         return
       accented_adverbs = [
          garde(accentize(self.key))
          for i in range(len(self.accented_keys))
       ]
-      yield nice_name(""), uniq(expose(form, yat, latin) for form in accented_adverbs)
+      yield RawMultiform("", accented_adverbs, [])
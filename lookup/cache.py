@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Generic, Hashable, NamedTuple, Optional, TypeVar
+
+KT = TypeVar("KT", bound=Hashable)
+VT = TypeVar("VT")
+
+class CacheInfo(NamedTuple):
+   """The same fields as in functools.lru_cache and a few more"""
+   hits: int
+   misses: int
+   maxsize: Optional[int]
+   currsize: int
+   evictions: int = 0
+   maxbytes: Optional[int] = None
+   currbytes: int = 0 # only counted if there is `maxbytes`
+
+class LRUCache(Generic[KT, VT]):
+   """
+   Like functools.lru_cache, but not tied to a single function,
+   so that results can also be added in bulk (see utils.expose_many).
+   `maxsize=None` means no limit, `maxsize=0` means remembering nothing.
+
+   With `maxbytes`, the least recently used values are also evicted when
+   their total size exceeds it. Sizes are estimated by `sizeof`.
+   """
+   def __init__(
+      self,
+      maxsize:Optional[int]=128,
+      maxbytes:Optional[int]=None,
+      sizeof:Optional[Callable[[VT], int]]=None
+   ) -> None:
+      if maxbytes is not None and sizeof is None:
+         raise ValueError("maxbytes needs sizeof")
+      self.maxsize = maxsize
+      self.maxbytes = maxbytes
+      self._sizeof = sizeof
+      self._data: "OrderedDict[KT, VT]" = OrderedDict()
+      self._sizes: "OrderedDict[KT, int]" = OrderedDict() # only used with maxbytes
+      self._lock = Lock()
+      self.hits = 0
+      self.misses = 0
+      self.evictions = 0
+      self.currbytes = 0
+
+   def get(self, key:KT) -> Optional[VT]:
+      with self._lock:
+         try:
+            value = self._data[key]
+         except KeyError:
+            self.misses += 1
+            return None
+         self._data.move_to_end(key)
+         self.hits += 1
+         return value
+
+   def __setitem__(self, key:KT, value:VT) -> None:
+      if self.maxsize == 0:
+         return
+      size = 0
+      if self.maxbytes is not None and self._sizeof is not None:
+         size = self._sizeof(value)
+         if size > self.maxbytes:
+            return # it would evict everything else
+      with self._lock:
+         if key in self._data:
+            self._pop(key)
+         self._data[key] = value
+         if self.maxbytes is not None:
+            self._sizes[key] = size
+            self.currbytes += size
+         while (
+            (self.maxsize is not None and len(self._data) > self.maxsize) or
+            (self.maxbytes is not None and self.currbytes > self.maxbytes)
+         ):
+            self._pop(next(iter(self._data)))
+            self.evictions += 1
+
+   def _pop(self, key:KT) -> None:
+      del self._data[key]
+      if self.maxbytes is not None:
+         self.currbytes -= self._sizes.pop(key)
+
+   def __len__(self) -> int:
+      return len(self._data)
+
+   def clear(self) -> None:
+      with self._lock:
+         self._data.clear()
+         self._sizes.clear()
+         self.hits = 0
+         self.misses = 0
+         self.evictions = 0
+         self.currbytes = 0
+
+   def cache_info(self) -> CacheInfo:
+      return CacheInfo(
+         self.hits, self.misses, self.maxsize, len(self._data),
+         self.evictions, self.maxbytes, self.currbytes
+      )
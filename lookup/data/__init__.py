@@ -1,65 +1,343 @@
-from os import path
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import logging
+from os import environ, path, stat
 from re import search as rsearch
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 import yaml
 from ..charutils import all_vowels, plain_accents
-from .multidict import Entry, FancyLookup
+from .entry_store import EntryStore, offload
+from .form_index import FormIndex, build_form_index
+from .multidict import Entry, FancyLookup, Multidict, inner_to_outer
+from .paradigm_store import ParadigmStore, ParadigmStoreError, write_paradigm_store
+from .snapshot import (
+   SnapshotError, file_digest, load_checked, load_snapshot, save_checked, save_snapshot
+)
 from ..utils import deaccentize, cyr2lat
 
-data = FancyLookup()
-
 dir_path = path.dirname(path.realpath(__file__))
 file_path = path.join(dir_path, "data.yml")
+snapshot_path = path.join(dir_path, "data.pickle")
+low_memory_snapshot_path = path.join(dir_path, "data.low.pickle")
+entry_store_path = path.join(dir_path, "data.entries")
+form_index_path = path.join(dir_path, "forms.pickle")
+paradigm_store_path = path.join(dir_path, "paradigms.sqlite")
+
+# In low memory mode, entries are kept on disk and only read when needed,
+# see entry_store.py. Set it before the first lookup.
+low_memory = bool(environ.get("JEZIK_LOW_MEMORY"))
+
+# the C loader is much faster but only exists if PyYAML was built with libyaml
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 posdict = {"N": "именица", "V": "глагол", "A": "придев", "B": "прилог"}
 
-with open(file_path, encoding="utf-8") as f:
-   raw_data = yaml.safe_load(f)
-for full_key in raw_data.keys():
-   if rsearch(f"[^{all_vowels}ъ][{plain_accents}]", full_key):
-      raise ValueError(full_key) # TODO WHY doesn't it work??
-   # full_key is with disambiguator, key is without
-   first_space = full_key.find(" ")
-   if first_space != -1:
-      accented_keys_with_extra_key : str = full_key[:first_space]
-      disambiguator = full_key[first_space+1:] + ":"
-   else:
-      accented_keys_with_extra_key = full_key
-      disambiguator = ""
-   if '\\' in accented_keys_with_extra_key:
-      accented_keys, extra_key = accented_keys_with_extra_key.split("\\", 1)
+def parse(raw_data:Dict[str, Any]) -> Iterator[Tuple[str, Entry]]:
+   """
+   Turns the contents of data.yml into (inner key, entry) pairs.
+   """
+   for full_key in raw_data.keys():
+      if rsearch(f"[^{all_vowels}ъ][{plain_accents}]", full_key):
+         raise ValueError(full_key) # TODO WHY doesn't it work??
+      # full_key is with disambiguator, key is without
+      first_space = full_key.find(" ")
+      if first_space != -1:
+         accented_keys_with_extra_key : str = full_key[:first_space]
+         disambiguator = full_key[first_space+1:] + ":"
+      else:
+         accented_keys_with_extra_key = full_key
+         disambiguator = ""
+      if '\\' in accented_keys_with_extra_key:
+         accented_keys, extra_key = accented_keys_with_extra_key.split("\\", 1)
+      else:
+         accented_keys = accented_keys_with_extra_key
+         extra_key = ''
+
+      unaccented_keys = deaccentize(accented_keys).split(',')
+      if len(set(unaccented_keys)) != 1:
+         raise ValueError(f"{unaccented_keys} do not match")
+
+      try:
+         comment = "(" + raw_data[full_key]["c"] + ")"
+      except KeyError:
+         comment = ""
+      try:
+         replacements = {x: y.split(", ") for x, y in raw_data[full_key]["except"].items()}
+      except KeyError:
+         replacements = {}
+      try:
+         amendments = {x: y.split(", ") for x, y in raw_data[full_key]["add"].items() }
+      except KeyError:
+         amendments = {}
+
+      raw_entry = raw_data[full_key]
+      current_pos = posdict[raw_entry["t"][0]]
+
+      caption = (f"{disambiguator} {current_pos} {comment}", disambiguator)
+      new_entry = Entry(
+         caption,
+         accented_keys,
+         extra_key,
+         raw_entry["t"],
+         raw_entry["i"],
+         tuple(replacements.items()),
+         tuple(amendments.items())
+      )
+
+      yield unaccented_keys[0], new_entry
+
+def read(yaml_path:str=file_path) -> Dict[str, Any]:
+   with open(yaml_path, encoding="utf-8") as f:
+      return yaml.load(f, Loader=_YamlLoader)
+
+def outer_keys(entries:List[Entry]) -> List[List[Tuple[str, str]]]:
+   """The (outer key, yat mode) pairs of every entry"""
+   return [list(inner_to_outer(entry.accented_keys, entry.extra_key)) for entry in entries]
+
+def build(yaml_path:str=file_path, workers:int=1) -> FancyLookup:
+   """
+   Builds the lookup from scratch, this is slow. With more than one worker,
+   the outer keys (which is where the time goes) are calculated in
+   that many processes. The result is the same either way.
+   """
+   pairs = list(parse(read(yaml_path)))
+   entries = [entry for _, entry in pairs]
+   if workers > 1:
+      # a few chunks per worker so that a slow chunk doesn't keep the others waiting
+      chunk_size = -(-len(entries) // (workers * 4))
+      chunks = [entries[i:i+chunk_size] for i in range(0, len(entries), chunk_size)]
+      with ProcessPoolExecutor(workers) as executor:
+         # `map` returns the results in the order of `chunks`
+         all_outer_keys = [keys for chunk in executor.map(outer_keys, chunks) for keys in chunk]
    else:
-      accented_keys = accented_keys_with_extra_key
-      extra_key = ''
+      all_outer_keys = outer_keys(entries)
+   result = FancyLookup()
+   with result.bulk():
+      for (inner_key, entry), keys in zip(pairs, all_outer_keys):
+         result.add(inner_key, entry, keys)
+   return result
 
-   unaccented_keys = deaccentize(accented_keys).split(',')
-   if len(set(unaccented_keys)) != 1:
-      raise ValueError(f"{unaccented_keys} do not match")
+def build_snapshot(workers:int=1) -> None:
+   digest = file_digest(file_path)
+   lookup = build(workers=workers)
+   save_snapshot(lookup, snapshot_path, digest)
+   offload(lookup, entry_store_path, digest)
+   save_snapshot(lookup, low_memory_snapshot_path, digest)
 
+def load() -> FancyLookup:
+   """
+   Loads the lookup from the snapshot if it matches data.yml,
+   otherwise builds it from data.yml.
+   """
+   digest = file_digest(file_path)
    try:
-      comment = "(" + raw_data[full_key]["c"] + ")"
-   except KeyError:
-      comment = ""
+      return load_snapshot(
+         low_memory_snapshot_path if low_memory else snapshot_path,
+         digest
+      )
+   except SnapshotError:
+      lookup = build()
+      if low_memory:
+         offload(lookup, entry_store_path, digest)
+      return lookup
+
+FileState = Optional[Tuple[int, int]]
+
+def file_state(file:str) -> FileState:
+   """Changes whenever the file is written, None if there's no such file"""
    try:
-      replacements = {x: y.split(", ") for x, y in raw_data[full_key]["except"].items()}
-   except KeyError:
-      replacements = {}
+      result = stat(file)
+   except OSError:
+      return None
+   return result.st_mtime_ns, result.st_size
+
+def build_forms() -> None:
+   save_checked(build_form_index(load()), form_index_path, file_digest(file_path))
+
+def load_form_index() -> FormIndex:
+   """
+   Loads the index of inflected forms if it has been built for this data.yml.
+   Otherwise returns an empty index, i.e. words can only be found by lemma.
+   It is loaded again whenever data.yml or the index file changes.
+   """
+   return _load_form_index(file_state(file_path), file_state(form_index_path))
+
+@lru_cache(maxsize=1)
+def _load_form_index(data_state:FileState, index_state:FileState) -> FormIndex:
    try:
-      amendments = {x: y.split(", ") for x, y in raw_data[full_key]["add"].items() }
-   except KeyError:
-      amendments = {}
-
-   raw_entry = raw_data[full_key]
-   current_pos = posdict[raw_entry["t"][0]]
-
-   caption = (f"{disambiguator} {current_pos} {comment}", disambiguator)
-   new_entry = Entry(
-      caption,
-      accented_keys,
-      extra_key,
-      raw_entry["t"],
-      raw_entry["i"],
-      tuple(replacements.items()),
-      tuple(amendments.items())
-   )
-
-   data[unaccented_keys[0]] = new_entry
+      result = load_checked(form_index_path, file_digest(file_path))
+   except SnapshotError:
+      return FormIndex()
+   return result if isinstance(result, FormIndex) else FormIndex()
+
+def build_paradigms() -> None:
+   write_paradigm_store(load(), paradigm_store_path, file_digest(file_path))
+
+def load_paradigm_store() -> Optional[ParadigmStore]:
+   """
+   Opens the store of precomputed paradigms if it has been built for this
+   data.yml. Otherwise returns None, i.e. paradigms are generated on the fly.
+   It is opened again whenever data.yml or the store file changes.
+   """
+   return _load_paradigm_store(file_state(file_path), file_state(paradigm_store_path))
+
+@lru_cache(maxsize=1)
+def _load_paradigm_store(data_state:FileState, store_state:FileState) -> Optional[ParadigmStore]:
+   try:
+      return ParadigmStore(paradigm_store_path, file_digest(file_path))
+   except ParadigmStoreError:
+      return None
+
+class LazyLookup:
+   """
+   Behaves like the FancyLookup returned by `loader`,
+   but doesn't call `loader` until it's used for the first time.
+   """
+   def __init__(self, loader:Callable[[], FancyLookup]) -> None:
+      self._loader = loader
+      # the version and the lookup, always replaced together in one assignment
+      self._current: Optional[Tuple[int, FancyLookup]] = None
+      self._version = 0 # changes whenever the lookup is swapped
+      self._lock = Lock()
+
+   def swap(self, lookup:FancyLookup) -> None:
+      """
+      Replaces the lookup. Callers that have already got the old one
+      with `get` keep using it, so they never see a half-updated state.
+      """
+      with self._lock:
+         self._version += 1
+         self._current = (self._version, lookup)
+
+   def versioned(self) -> Tuple[int, FancyLookup]:
+      """The lookup and its version, which always belong together"""
+      current = self._current
+      if current is None:
+         with self._lock: # so that two threads don't load it twice
+            if self._current is None:
+               self._current = (self._version, self._loader())
+            current = self._current
+      return current
+
+   def get(self) -> FancyLookup:
+      return self.versioned()[1]
+
+   @property
+   def version(self) -> int:
+      return self._version
+
+   @property
+   def loaded(self) -> bool:
+      return self._current is not None
+
+   def __getitem__(self, key_with_mode:Tuple[str, str]) -> Iterator[Tuple[str, Entry]]:
+      return self.get()[key_with_mode]
+
+   def entries(self, inner_key:str) -> List[Entry]:
+      return self.get().entries(inner_key)
+
+   def suggest(self, prefix:str, input_yat:str, limit:int) -> List[str]:
+      return self.get().suggest(prefix, input_yat, limit)
+
+   def similar(self, key:str, input_yat:str, limit:int, time_budget:float) -> List[str]:
+      return self.get().similar(key, input_yat, limit, time_budget)
+
+   def random_key(
+      self,
+      by:str="outer",
+      pos_weights:Optional[Dict[str, float]]=None
+   ) -> Tuple[str, str]:
+      return self.get().random_key(by, pos_weights)
+
+   def __getattr__(self, name:str) -> Any:
+      return getattr(self.get(), name)
+
+data = LazyLookup(load)
+
+def diff(lookup:FancyLookup, raw_data:Dict[str, Any]) -> Dict[str, List[Entry]]:
+   """
+   Compares `lookup` with `raw_data` (the new contents of data.yml).
+   Returns the new entries of every inner key that has changed,
+   an empty list if the word has been removed.
+   """
+   new_entries = Multidict[str, Entry]()
+   with new_entries.bulk(): # sorted the same way as in `lookup`
+      for inner_key, entry in parse(raw_data):
+         new_entries[inner_key] = entry
+   result = {
+      inner_key: new_entries[inner_key] for inner_key in new_entries
+      if lookup.entries(inner_key) != new_entries[inner_key]
+   }
+   for inner_key in lookup._inner_to_entries:
+      if not new_entries[inner_key]:
+         result[inner_key] = []
+   return result
+
+def patch(lookup:FancyLookup, changes:Dict[str, List[Entry]]) -> FancyLookup:
+   """
+   Returns a copy of `lookup` with `changes` (see `diff`) applied.
+   Only the changed words are rebuilt, `lookup` itself isn't modified.
+   """
+   result = lookup.copy()
+   for inner_key, entries in changes.items():
+      result.replace(inner_key, entries)
+   return result
+
+_reload_lock = Lock()
+
+def reload() -> List[str]:
+   """
+   Makes `data` match data.yml again after it has been edited,
+   without restarting the process. Returns the inner keys of the words
+   that have changed. The index of inflected forms is only used again
+   after it has been rebuilt for the new data.yml, and so is the store
+   of precomputed paradigms (see `load_form_index` and `load_paradigm_store`).
+
+   In low memory mode this is much slower: finding the changes reads every
+   entry from data.entries, and any change rebuilds the whole lookup and
+   rewrites data.entries, because the entries on disk can't be patched.
+   """
+   with _reload_lock: # so that two reloads don't overwrite each other's results
+      if not data.loaded:
+         return [] # it will be loaded from the current data.yml anyway
+      current = data.get()
+      changes = diff(current, read())
+      if changes:
+         if isinstance(current._inner_to_entries, EntryStore):
+            new = load() # a full rebuild, see above
+         else:
+            new = patch(current, changes)
+         # so that queries don't wait for the indices of the new data
+         new.prepare_similar([yat for yat, index in current._fuzzy_indices.items() if index])
+         data.swap(new)
+      return list(changes)
+
+class Watcher(Thread):
+   """Calls `reload` whenever data.yml is modified"""
+
+   def __init__(self, interval:float=1.0) -> None:
+      super().__init__(name="data.yml watcher", daemon=True)
+      self.interval = interval
+      self._stopped = Event()
+
+   def run(self) -> None:
+      last_modified = path.getmtime(file_path)
+      while not self._stopped.wait(self.interval):
+         try:
+            modified = path.getmtime(file_path)
+            if modified != last_modified:
+               last_modified = modified
+               changed = reload()
+               logging.getLogger(__name__).info("reloaded %s words", len(changed))
+         except Exception: # e.g. a syntax error, the old data is kept
+            logging.getLogger(__name__).exception("can't reload %s", file_path)
+
+   def stop(self) -> None:
+      self._stopped.set()
+
+def watch(interval:float=1.0) -> Watcher:
+   """Starts checking data.yml for changes every `interval` seconds"""
+   watcher = Watcher(interval)
+   watcher.start()
+   return watcher
@@ -0,0 +1,35 @@
+# This file is a tool intended to be run from the terminal as
+# `python -m jezik.lookup.data` from outside the `jezik` directory.
+# It prebuilds everything that can be prebuilt from data.yml.
+
+import argparse
+import os
+from . import (
+   build_forms, build_paradigms, build_snapshot, entry_store_path,
+   form_index_path, low_memory_snapshot_path, paradigm_store_path, snapshot_path
+)
+
+if __name__ == '__main__':
+   parser = argparse.ArgumentParser(description='Prebuild the dictionary from data.yml')
+   parser.add_argument(
+      '--forms', action='store_const', const=True,
+      help='Also index all inflected forms (takes a few minutes)'
+   )
+   parser.add_argument(
+      '--paradigms', action='store_const', const=True,
+      help='Also precompute all paradigms, so that lookups are served from disk'
+   )
+   parser.add_argument(
+      '--workers', type=int, default=os.cpu_count() or 1,
+      help='How many processes to build the dictionary in (default: one per CPU)'
+   )
+   args = parser.parse_args()
+   build_snapshot(args.workers)
+   for written in (snapshot_path, low_memory_snapshot_path, entry_store_path):
+      print(f'Written {written}')
+   if args.forms:
+      build_forms()
+      print(f'Written {form_index_path}')
+   if args.paradigms:
+      build_paradigms()
+      print(f'Written {paradigm_store_path}')
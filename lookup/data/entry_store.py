@@ -0,0 +1,140 @@
+"""
+A low-memory alternative to keeping every Entry in RAM.
+
+The entries are written to a file, one record per inner key. In memory we
+only keep the offsets of the records, the records themselves are decoded from
+a memory-mapped file when they are needed and a few of them are cached.
+
+File layout:
+   pickled header (STORE_VERSION, digest of data.yml)
+   records, each one is a pickled list of plain tuples, one per Entry
+   pickled index: a list of inner keys, an array of record offsets and
+      the types of the entries of every record (see EntryStore.types)
+   8 bytes: the offset of the index
+"""
+
+from array import array
+from functools import lru_cache
+import mmap
+import os
+import pickle
+import struct
+from typing import Any, Dict, Iterator, List, Tuple
+from .multidict import Entry, FancyLookup, Multidict
+
+STORE_VERSION = 2
+
+_trailer = struct.Struct("<Q")
+
+class EntryStoreError(Exception):
+   """The entry store file is missing, stale or unreadable."""
+
+def write_entry_store(entries:Multidict[str, Entry], path:str, digest:str) -> None:
+   tmp_path = f"{path}.{os.getpid()}.tmp"
+   keys = list(entries)
+   offsets = array("Q")
+   types = [tuple(e.type for e in entries[key]) for key in keys]
+   with open(tmp_path, "wb") as f:
+      pickle.dump((STORE_VERSION, digest), f, pickle.HIGHEST_PROTOCOL)
+      for key in keys:
+         offsets.append(f.tell())
+         # plain tuples so that the file doesn't depend on where Entry is defined
+         f.write(pickle.dumps([tuple(e) for e in entries[key]], pickle.HIGHEST_PROTOCOL))
+      index_offset = f.tell()
+      offsets.append(index_offset) # where the last record ends
+      pickle.dump((keys, offsets, types), f, pickle.HIGHEST_PROTOCOL)
+      f.write(_trailer.pack(index_offset))
+   os.replace(tmp_path, path) # other processes never see a half-written file
+
+def _map(path:str, digest:str) -> Tuple[mmap.mmap, List[str], array, List[Tuple[str, ...]]]:
+   """
+   Maps the file and reads its index from the mapping, so that the index
+   always belongs to the mapped file even if the file is replaced later.
+   """
+   try:
+      with open(path, "rb") as f:
+         mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+   except Exception as e:
+      raise EntryStoreError(f"can't read {path}: {e!r}") from e
+   try:
+      if pickle.load(mapped) != (STORE_VERSION, digest):
+         raise EntryStoreError(f"{path} is stale")
+      index_offset, = _trailer.unpack(mapped[-_trailer.size:])
+      mapped.seek(index_offset)
+      keys, offsets, types = pickle.load(mapped)
+      return mapped, keys, offsets, types
+   except Exception as e:
+      mapped.close()
+      if isinstance(e, EntryStoreError):
+         raise
+      raise EntryStoreError(f"can't read {path}: {e!r}") from e
+
+class EntryStore(Multidict[str, Entry]):
+   """
+   A read-only Multidict from inner keys to entries that are stored on disk.
+   """
+   def __init__(self, path:str, digest:str, cache_size:int=256) -> None:
+      super().__init__()
+      self._path = path
+      self._digest = digest
+      self._cache_size = cache_size
+      self._mmap, keys, self._offsets, self._types = _map(path, digest)
+      # record number i starts at self._offsets[i] and ends at self._offsets[i+1]
+      # and its entries have the types self._types[i]
+      self._positions = {key: i for i, key in enumerate(keys)}
+      self._cached_decode = lru_cache(maxsize=cache_size)(self._decode)
+
+   def _decode(self, key:str) -> List[Entry]:
+      i = self._positions[key]
+      start, stop = self._offsets[i], self._offsets[i+1]
+      return [Entry(*fields) for fields in pickle.loads(self._mmap[start:stop])]
+
+   def __getitem__(self, key:str) -> List[Entry]:
+      if key not in self._positions:
+         return []
+      return self._cached_decode(key)
+
+   def types(self, key:str) -> Tuple[str, ...]:
+      """The types of the entries of `key`, without reading them from disk"""
+      i = self._positions.get(key)
+      return () if i is None else self._types[i]
+
+   def __setitem__(self, key:str, value:Entry) -> None:
+      raise TypeError("EntryStore is read-only")
+
+   def replace(self, key:str, values:List[Entry]) -> None:
+      raise TypeError("EntryStore is read-only")
+
+   def copy(self) -> Multidict[str, Entry]:
+      raise TypeError("EntryStore can't be copied")
+
+   def __iter__(self) -> Iterator[str]:
+      return iter(self._positions)
+
+   def __len__(self) -> int:
+      return len(self._positions)
+
+   def cache_info(self) -> Any:
+      return self._cached_decode.cache_info()
+
+   # only the location of the file is pickled, the index is read from it again
+
+   def __getstate__(self) -> Tuple[str, str, int]:
+      return self._path, self._digest, self._cache_size
+
+   def __setstate__(self, state:Tuple[str, str, int]) -> None:
+      self.__init__(*state) # type: ignore
+
+def offload(lookup:FancyLookup, path:str, digest:str) -> None:
+   """
+   Moves the entries of `lookup` to the file at `path`
+   (reusing the file if it's up to date) and keeps only their offsets.
+   """
+   if isinstance(lookup._inner_to_entries, EntryStore):
+      return
+   try:
+      store = EntryStore(path, digest)
+   except EntryStoreError:
+      write_entry_store(lookup._inner_to_entries, path, digest)
+      store = EntryStore(path, digest)
+   lookup._inner_to_entries = store
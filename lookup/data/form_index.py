@@ -0,0 +1,143 @@
+"""
+An index from inflected forms to the words they belong to, e.g. from носим
+to носити. Generating every paradigm takes minutes, so the index is built
+offline (see __main__.py) and saved next to data.yml.
+
+There are hundreds of thousands of forms, so instead of a dict with a string
+and a list per form we keep, for every yat mode, all forms sorted and glued
+into one string and the hits packed into arrays of integers. Forms are found
+by bisection, which still takes only microseconds.
+"""
+
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from .multidict import FancyLookup
+from ..utils import cyr2lat, deaccentize, strip_suffix
+
+class FormHit(NamedTuple):
+   inner_key: str
+   entry_index: int # among the entries of inner_key
+   variant: int
+   label: str
+
+# input yat mode -> yat mode used to generate the forms
+# (je and ije forms are the same after deaccentizing)
+_generated_yat = {"e": "e", "ije": "ije"}
+
+# a hit is packed into an int as entry_number << 11 | variant << 8 | label_number
+_variant_bits = 3
+_label_bits = 8
+
+class _SortedForms:
+   """The forms of one yat mode, with their hits"""
+
+   def __init__(self, forms:Dict[str, List[int]]) -> None:
+      sorted_forms = sorted(forms)
+      self._text = "".join(sorted_forms)
+      # form number i is self._text[self._starts[i]:self._starts[i+1]],
+      # its hits are self._hits[self._hit_starts[i]:self._hit_starts[i+1]]
+      self._starts = array("L", [0])
+      self._hit_starts = array("L", [0])
+      self._hits = array("L")
+      for form in sorted_forms:
+         self._starts.append(self._starts[-1] + len(form))
+         self._hits.extend(forms[form])
+         self._hit_starts.append(len(self._hits))
+
+   def _form(self, i:int) -> str:
+      return self._text[self._starts[i]:self._starts[i+1]]
+
+   def __getitem__(self, form:str) -> List[int]:
+      low, high = 0, len(self._starts) - 1
+      while low < high:
+         middle = (low + high) // 2
+         if self._form(middle) < form:
+            low = middle + 1
+         else:
+            high = middle
+      if low < len(self._starts) - 1 and self._form(low) == form:
+         return list(self._hits[self._hit_starts[low]:self._hit_starts[low+1]])
+      return []
+
+   def __len__(self) -> int:
+      return len(self._starts) - 1
+
+class FormIndex:
+   def __init__(
+      self,
+      forms:Optional[Dict[str, Dict[str, List[int]]]]=None,
+      entries:Optional[List[Tuple[str, int]]]=None,
+      labels:Optional[List[str]]=None
+   ) -> None:
+      """
+      `forms`: input yat mode -> form -> packed hits
+      `entries`: (inner key, entry index) by entry number
+      `labels`: labels by label number
+      """
+      self._forms = {yat: _SortedForms(f) for yat, f in (forms or {}).items()}
+      self._entries = entries or []
+      self._labels = labels or []
+
+   def __getitem__(self, form_with_mode:Tuple[str, str]) -> List[FormHit]:
+      form, input_yat = form_with_mode
+      if input_yat not in self._forms:
+         return []
+      result = []
+      for hit in self._forms[input_yat][form.lower()]:
+         entry_number = hit >> (_variant_bits + _label_bits)
+         variant = (hit >> _label_bits) & ((1 << _variant_bits) - 1)
+         label_number = hit & ((1 << _label_bits) - 1)
+         inner_key, entry_index = self._entries[entry_number]
+         result.append(FormHit(inner_key, entry_index, variant, self._labels[label_number]))
+      return result
+
+   def __len__(self) -> int:
+      return sum(len(forms) for forms in self._forms.values())
+
+def build_form_index(
+   lookup:FancyLookup,
+   inner_keys:Optional[Iterable[str]]=None
+) -> FormIndex:
+   """
+   Generates all forms of all words (or of the words with the given
+   inner keys) and indexes them. This is very slow.
+   """
+   from ..pos import part_of_speech # importing it on top would be circular
+
+   forms: Dict[str, Dict[str, List[int]]] = {yat: {} for yat in _generated_yat}
+   entries: List[Tuple[str, int]] = []
+   labels: Dict[str, int] = {}
+
+   for inner_key in lookup._inner_to_entries if inner_keys is None else inner_keys:
+      for entry_index, entry in enumerate(lookup.entries(inner_key)):
+         POS = part_of_speech(entry.type)
+         if POS is None:
+            continue
+         entry_number = len(entries)
+         entries.append((inner_key, entry_index))
+         for input_yat, yat in _generated_yat.items():
+            word = POS(
+               inner_key, entry.accented_keys, entry.type, entry.info,
+               entry.replacements, entry.amendments
+            )
+            if len(word.accented_keys) > 1 << _variant_bits:
+               raise ValueError(f"too many variants in {inner_key}")
+            for variant in range(len(word.accented_keys)):
+               for label, multiform in word.multiforms(variant=variant, yat=yat):
+                  label_number = labels.setdefault(label, len(labels))
+                  if label_number >= 1 << _label_bits:
+                     raise ValueError("too many different labels")
+                  hit = (
+                     entry_number << (_variant_bits + _label_bits) |
+                     variant << _label_bits |
+                     label_number
+                  )
+                  for form in multiform:
+                     form, _ = strip_suffix(deaccentize(form).lower(), (" се",))
+                     if not form:
+                        continue
+                     for script_form in (form, cyr2lat(form)):
+                        hits = forms[input_yat].setdefault(script_form, [])
+                        if hit not in hits:
+                           hits.append(hit)
+   return FormIndex(forms, entries, list(labels))
@@ -0,0 +1,134 @@
+"""
+Finding outer keys that are similar to a misspelled query.
+
+Keys are compared after folding, i.e. after removing the diacritics that
+people often don't type (so "ceo" and "ćeo" are the same), and similarity is
+the Levenshtein distance between the folded strings. To avoid comparing the
+query with every key, the folded keys are stored in a BK-tree.
+"""
+
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+_fold_translator = str.maketrans("čćđšžČĆĐŠŽ", "ccdszCCDSZ")
+
+def fold(text:str) -> str:
+   return text.translate(_fold_translator)
+
+def distance_from(a:str) -> Callable[[str], int]:
+   """
+   Returns a function that calculates the Levenshtein distance from `a`.
+   It uses Myers' bit-parallel algorithm: one bit per character of `a`,
+   so every character of the other string costs a few integer operations
+   instead of a whole row of the usual dynamic programming table.
+   """
+   if not a:
+      return len
+   peq: Dict[str, int] = {} # for every char, the positions where it occurs in `a`
+   for i, char in enumerate(a):
+      peq[char] = peq.get(char, 0) | (1 << i)
+   mask = (1 << len(a)) - 1
+   last = 1 << (len(a) - 1)
+
+   def distance(b:str) -> int:
+      pv, mv, score = mask, 0, len(a)
+      for char in b:
+         eq = peq.get(char, 0)
+         xv = eq | mv
+         xh = (((eq & pv) + pv) ^ pv) | eq
+         ph = mv | ~(xh | pv)
+         mh = pv & xh
+         if ph & last:
+            score += 1
+         elif mh & last:
+            score -= 1
+         ph = (ph << 1) | 1
+         mh = mh << 1
+         pv = (mh | ~(xv | ph)) & mask
+         mv = ph & xv & mask
+      return score
+
+   return distance
+
+def levenshtein(a:str, b:str) -> int:
+   return distance_from(a)(b)
+
+class _Node:
+   __slots__ = ("word", "children")
+
+   def __init__(self, word:str) -> None:
+      self.word = word
+      self.children: Dict[int, _Node] = {}
+
+class BKTree:
+   """
+   A metric tree: every child of a node is stored under its distance
+   from the node, which lets `search` skip whole subtrees.
+   """
+   def __init__(self, words:Iterable[str]) -> None:
+      self._root: Optional[_Node] = None
+      for word in words:
+         self.add(word)
+
+   def add(self, word:str) -> None:
+      if self._root is None:
+         self._root = _Node(word)
+         return
+      node = self._root
+      while True:
+         distance = levenshtein(word, node.word)
+         if distance == 0:
+            return
+         child = node.children.get(distance)
+         if child is None:
+            node.children[distance] = _Node(word)
+            return
+         node = child
+
+   def search(self, word:str, max_distance:int, deadline:float) -> List[Tuple[int, str]]:
+      """
+      Returns (distance, word) pairs for all words within `max_distance`.
+      Stops early and returns what it has found so far
+      when `perf_counter()` reaches `deadline`.
+      """
+      result = []
+      distance_from_word = distance_from(word)
+      stack = [self._root] if self._root else []
+      while stack and perf_counter() < deadline:
+         node = stack.pop()
+         distance = distance_from_word(node.word)
+         if distance <= max_distance:
+            result.append((distance, node.word))
+         for child_distance, child in node.children.items():
+            if distance - max_distance <= child_distance <= distance + max_distance:
+               stack.append(child)
+      return result
+
+class FuzzyIndex:
+   """Similar outer keys for one yat mode"""
+
+   max_query_length = 30 # longer queries aren't misspelled words
+
+   def __init__(self, keys:Iterable[str]) -> None:
+      self._folded: Dict[str, List[str]] = {}
+      for key in keys:
+         self._folded.setdefault(fold(key), []).append(key)
+      self._tree = BKTree(sorted(self._folded))
+
+   def similar(self, query:str, limit:int, time_budget:float) -> List[str]:
+      """
+      Returns up to `limit` keys similar to `query`, the most similar first.
+      Gives up after `time_budget` seconds, returning what it has found so far.
+      """
+      if len(query) > self.max_query_length:
+         return []
+      # two typos in a short word can turn it into almost any other short word
+      max_distance = 1 if len(query) <= 5 else 2
+      deadline = perf_counter() + time_budget
+      found = sorted(self._tree.search(fold(query), max_distance, deadline))
+      result: List[str] = []
+      for _, folded in found:
+         for key in sorted(self._folded[folded]):
+            if key != query and key not in result:
+               result.append(key)
+      return result[:limit]
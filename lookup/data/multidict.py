@@ -1,8 +1,16 @@
-from typing import Dict, Generic, List, NamedTuple, Iterator, Tuple, TypeVar
+from contextlib import contextmanager
+from typing import (
+   Dict, Generic, Iterable, List, NamedTuple, Iterator, Optional, Sequence, Set, Tuple, TypeVar
+)
 import random
+from sys import intern
+from threading import Lock, Thread
 from ..utils import all_vowels, cyr2lat, deaccentize, expose, garde
 from ..paradigm_helpers import accentize, i_to_accents, uniq
 from ..charutils import cmacron
+from .fuzzy import FuzzyIndex
+from .prefix_index import PrefixIndex
+from .sampler import KeySampler
 
 Replacement = Tuple[str, List[str]]
 
@@ -18,6 +26,7 @@ class Multidict(Generic[KT, VT]):
    """
    def __init__(self) -> None:
       self._data: Dict[KT, List[VT]] = {}
+      self._unsorted: Optional[Set[KT]] = None # only used inside `bulk`
 
    def __getitem__(self, key: KT) -> List[VT]:
       try:
@@ -28,11 +37,55 @@ class Multidict(Generic[KT, VT]):
    def __setitem__(self, key: KT, value: VT) -> None:
       if key in self._data:
          self._data[key].append(value)
-         self._data[key] = list(set(self._data[key]))
-         self._data[key].sort()
+         if self._unsorted is None:
+            self._data[key] = list(set(self._data[key]))
+            self._data[key].sort()
+         else:
+            self._unsorted.add(key)
       else:
          self._data[key] = [value]
 
+   @contextmanager
+   def bulk(self) -> Iterator[None]:
+      """
+      Inside this context, new values are only appended. They are deduplicated
+      and sorted once on exit, which gives the same result as inserting them
+      one by one but avoids sorting on every insert.
+      Don't read from the Multidict before the context is exited.
+      """
+      self._unsorted = set()
+      try:
+         yield
+      finally:
+         for key in self._unsorted:
+            self._data[key] = list(set(self._data[key]))
+            self._data[key].sort()
+         self._unsorted = None
+
+   def replace(self, key: KT, values: List[VT]) -> None:
+      """
+      Replaces all values of `key` (no values means deleting the key).
+      The old list is never modified, so copies made with `copy` are safe.
+      """
+      if values:
+         unique: List[VT] = []
+         for value in values: # not `set` because some values aren't hashable
+            if value not in unique:
+               unique.append(value)
+         unique.sort()
+         self._data[key] = unique
+      else:
+         self._data.pop(key, None)
+
+   def copy(self) -> "Multidict[KT, VT]":
+      """
+      A shallow copy: the lists of values are shared with the original,
+      so only change the copy with `replace`, never with `__setitem__`.
+      """
+      result = Multidict[KT, VT]()
+      result._data = self._data.copy()
+      return result
+
    def __iter__(self):
       return iter(self._data)
 
@@ -59,6 +112,25 @@ class Entry(NamedTuple):
    replacements: Tuple[Replacement, ...]
    amendments: Tuple[Replacement, ...]
 
+# there are only about a hundred different captions
+_captions: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+def intern_entry(entry:Entry) -> Entry:
+   """
+   The same entry, but its strings are shared with equal strings of other
+   entries: a few hundred types, infos and captions repeat thousands of times.
+   """
+   caption = (intern(entry.caption[0]), intern(entry.caption[1]))
+   return Entry(
+      _captions.setdefault(caption, caption),
+      intern(entry.accented_keys),
+      intern(entry.extra_key),
+      intern(entry.type),
+      intern(entry.info),
+      tuple((intern(label), forms) for label, forms in entry.replacements),
+      tuple((intern(label), forms) for label, forms in entry.amendments)
+   )
+
 
 def inner_to_outer(accented_keys:str, extra_key:str) -> Iterator[Tuple[str, str]]:
    """
@@ -99,12 +171,21 @@ def inner_to_outer(accented_keys:str, extra_key:str) -> Iterator[Tuple[str, str]
          yield cyr2lat(deaccentized_token), input_yat
 
 
+# guards starting the background builds of fuzzy indices (a Lock can't be
+# an attribute of FancyLookup, which is pickled)
+_fuzzy_lock = Lock()
+
 class FancyLookup:
 
    def __init__(self) -> None:
       self._inner_to_entries = Multidict[str, Entry]()
       self._outer_to_inner = Multidict[Tuple[str, str], str]()
       # in this Tuple[str, str] the first str is the outer key and the second is the yat mode
+      self._prefix_index: Optional[PrefixIndex] = None # built on first use
+      # one per yat mode, built by `prepare_similar` or in the background on
+      # first use; None while it is being built
+      self._fuzzy_indices: Dict[str, Optional[FuzzyIndex]] = {}
+      self._sampler: Optional[KeySampler] = None # built on first use
 
    def __getitem__(self, key_with_mode: Tuple[str, str]) -> Iterator[Tuple[str, Entry]]:
       outer_key, input_yat = key_with_mode
@@ -114,10 +195,167 @@ class FancyLookup:
             yield key, entry
 
    def __setitem__(self, inner_key: str, value: Entry) -> None:
-      self._inner_to_entries[inner_key] = value
+      self.add(inner_key, value, inner_to_outer(value.accented_keys, value.extra_key))
+
+   def add(
+      self,
+      inner_key:str,
+      value:Entry,
+      outer_keys:Iterable[Tuple[str, str]]
+   ) -> None:
+      """
+      Like `lookup[inner_key] = value`, but with the (outer key, yat mode)
+      pairs already calculated, e.g. in another process.
+      Strings are interned, e.g. an outer key is usually the same in all
+      three yat modes and the inner key is repeated for every outer key.
+      """
+      inner_key = intern(inner_key)
+      self._inner_to_entries[inner_key] = intern_entry(value)
+
+      for outer_key, input_yat in outer_keys:
+         self._outer_to_inner[(intern(outer_key), intern(input_yat))] = inner_key
+      self._prefix_index = None
+      self._fuzzy_indices = {}
+      self._sampler = None
 
-      for outer_key, input_yat in inner_to_outer(value.accented_keys, value.extra_key):
-         self._outer_to_inner[(outer_key, input_yat)] = inner_key
+   @contextmanager
+   def bulk(self) -> Iterator[None]:
+      """See Multidict.bulk"""
+      with self._inner_to_entries.bulk(), self._outer_to_inner.bulk():
+         yield
 
-   def random_key(self) -> Tuple[str, str]:
-      return random.choice(list(self._outer_to_inner))
+   def copy(self) -> "FancyLookup":
+      """A copy that can be patched with `replace` while this one is in use"""
+      result = FancyLookup()
+      result._inner_to_entries = self._inner_to_entries.copy()
+      result._outer_to_inner = self._outer_to_inner.copy()
+      return result
+
+   def replace(self, inner_key:str, entries:List[Entry]) -> None:
+      """
+      Replaces all entries of `inner_key` (no entries means deleting the word)
+      and updates its outer keys.
+      """
+      inner_key = intern(inner_key)
+      entries = [intern_entry(entry) for entry in entries]
+      def outer_keys(entries:List[Entry]) -> Set[Tuple[str, str]]:
+         return {
+            (intern(outer_key), intern(input_yat))
+            for entry in entries
+            for outer_key, input_yat in inner_to_outer(entry.accented_keys, entry.extra_key)
+         }
+      old_outer_keys = outer_keys(self._inner_to_entries[inner_key])
+      new_outer_keys = outer_keys(entries)
+      for key_with_mode in old_outer_keys - new_outer_keys:
+         self._outer_to_inner.replace(key_with_mode, [
+            k for k in self._outer_to_inner[key_with_mode] if k != inner_key
+         ])
+      for key_with_mode in new_outer_keys - old_outer_keys:
+         self._outer_to_inner.replace(
+            key_with_mode,
+            self._outer_to_inner[key_with_mode] + [inner_key]
+         )
+      self._inner_to_entries.replace(inner_key, entries)
+      self._prefix_index = None
+      self._fuzzy_indices = {}
+      self._sampler = None
+
+   def entries(self, inner_key:str) -> List[Entry]:
+      return self._inner_to_entries[inner_key]
+
+   def suggest(self, prefix:str, input_yat:str, limit:int) -> List[str]:
+      """Returns up to `limit` outer keys that start with `prefix`, in alphabetical order"""
+      if self._prefix_index is None:
+         self._prefix_index = PrefixIndex(self._outer_to_inner)
+      return self._prefix_index.complete(prefix.lower(), input_yat, limit)
+
+   def _fuzzy_index(self, input_yat:str) -> FuzzyIndex:
+      return FuzzyIndex(
+         outer_key for outer_key, mode in self._outer_to_inner if mode == input_yat
+      )
+
+   def prepare_similar(self, input_yats:Iterable[str]=("e", "ije")) -> None:
+      """
+      Builds the indices that `similar` needs right away, which takes a few
+      hundred milliseconds. The default yat modes are the ones `did_you_mean`
+      uses (it looks "je" up as "ije").
+      """
+      indices = self._fuzzy_indices
+      for input_yat in input_yats:
+         if indices.get(input_yat) is None:
+            indices[input_yat] = self._fuzzy_index(input_yat)
+
+   def similar(self, key:str, input_yat:str, limit:int, time_budget:float) -> List[str]:
+      """
+      Returns up to `limit` outer keys that look like misspellings of `key`.
+      If the index for `input_yat` hasn't been built (see `prepare_similar`),
+      it is built in the background and nothing is returned meanwhile,
+      so that no query takes much longer than `time_budget`.
+      """
+      indices = self._fuzzy_indices
+      with _fuzzy_lock:
+         if input_yat in indices:
+            index = indices[input_yat]
+         else:
+            index = indices[input_yat] = None
+            Thread(
+               target=self._build_in_background, args=(indices, input_yat),
+               name=f"fuzzy index ({input_yat})", daemon=True
+            ).start()
+      if index is None:
+         return []
+      return index.similar(key.lower(), limit, time_budget)
+
+   def _build_in_background(
+      self,
+      indices:Dict[str, Optional[FuzzyIndex]],
+      input_yat:str
+   ) -> None:
+      try:
+         indices[input_yat] = self._fuzzy_index(input_yat)
+      except Exception:
+         with _fuzzy_lock: # so that the next call tries again
+            indices.pop(input_yat, None)
+         raise
+
+   def random_key(
+      self,
+      by:str="outer",
+      pos_weights:Optional[Dict[str, float]]=None
+   ) -> Tuple[str, str]:
+      """
+      Returns a random (outer key, yat mode) pair. With by="outer", every
+      outer key is equally likely, so words with more spellings come up
+      more often. With by="entry", every entry is equally likely, and
+      `pos_weights` (see KeySampler.entry) can favour some parts of speech.
+      """
+      if self._sampler is None:
+         from .entry_store import EntryStore # importing it on top would be circular
+         entries = self._inner_to_entries
+         if isinstance(entries, EntryStore):
+            # the types are in the index, so no entry is read from disk
+            types: Iterator[Tuple[str, Sequence[str]]] = (
+               (inner_key, entries.types(inner_key)) for inner_key in entries
+            )
+         else:
+            types = (
+               (inner_key, [entry.type for entry in entries[inner_key]])
+               for inner_key in entries
+            )
+         self._sampler = KeySampler(
+            self._outer_to_inner,
+            (
+               ((inner_key, i), kind)
+               for inner_key, kinds in types
+               for i, kind in enumerate(kinds)
+            )
+         )
+      if by == "outer":
+         if pos_weights is not None:
+            raise ValueError("pos_weights only work with by='entry'")
+         return self._sampler.outer()
+      if by == "entry":
+         inner_key, i = self._sampler.entry(pos_weights)
+         entry = self.entries(inner_key)[i]
+         return random.choice(list(inner_to_outer(entry.accented_keys, entry.extra_key)))
+      raise ValueError(f"unknown sampling mode {by}")
@@ -0,0 +1,112 @@
+"""
+Precomputed paradigms of every word, so that a lookup doesn't need to run
+the accentuation engine at all. Generating them takes minutes, so the store
+is built offline (see __main__.py) and saved next to data.yml.
+
+The store is an SQLite database with one row per paradigm, i.e. per entry,
+variant and yat mode (Latin tables are transliterated from the Cyrillic
+ones, see table.to_latin). The cells are kept as JSON.
+
+Tables:
+   meta (version, digest): STORE_VERSION and the digest of data.yml
+   paradigms (inner_key, entry_index, variant, yat, cells)
+"""
+
+import json
+import os
+import sqlite3
+from threading import Lock
+from typing import Iterable, List, Optional, Tuple
+from .multidict import FancyLookup
+
+STORE_VERSION = 1
+
+_yats = ("e", "je", "ije")
+
+class ParadigmStoreError(Exception):
+   """The paradigm store is missing, stale or unreadable."""
+
+def write_paradigm_store(
+   lookup:FancyLookup,
+   path:str,
+   digest:str,
+   inner_keys:Optional[Iterable[str]]=None
+) -> None:
+   """
+   Generates all paradigms of all words (or of the words with the given
+   inner keys) and writes them to `path`. This is very slow.
+   """
+   from ..pos import part_of_speech # importing it on top would be circular
+
+   tmp_path = f"{path}.{os.getpid()}.tmp"
+   if os.path.exists(tmp_path):
+      os.remove(tmp_path)
+   connection = sqlite3.connect(tmp_path)
+   try:
+      connection.execute("CREATE TABLE meta (version INTEGER, digest TEXT)")
+      connection.execute("INSERT INTO meta VALUES (?, ?)", (STORE_VERSION, digest))
+      connection.execute(
+         "CREATE TABLE paradigms ("
+         "inner_key TEXT, entry_index INTEGER, variant INTEGER, yat TEXT, cells TEXT, "
+         "PRIMARY KEY (inner_key, entry_index, variant, yat)) WITHOUT ROWID"
+      )
+      for inner_key in lookup._inner_to_entries if inner_keys is None else inner_keys:
+         for entry_index, entry in enumerate(lookup.entries(inner_key)):
+            POS = part_of_speech(entry.type)
+            if POS is None:
+               continue
+            word = POS(
+               inner_key, entry.accented_keys, entry.type, entry.info,
+               entry.replacements, entry.amendments
+            )
+            connection.executemany(
+               "INSERT INTO paradigms VALUES (?, ?, ?, ?, ?)",
+               (
+                  (inner_key, entry_index, variant, yat, json.dumps(paradigm, ensure_ascii=False))
+                  for variant in range(len(word.accented_keys))
+                  for yat, paradigm in word.multiforms_by_yat(variant=variant, yats=_yats).items()
+               )
+            )
+      connection.commit()
+   finally:
+      connection.close()
+   os.replace(tmp_path, path) # other processes never see a half-written file
+
+class ParadigmStore:
+   """Reads the paradigms written by `write_paradigm_store`"""
+
+   def __init__(self, path:str, digest:str) -> None:
+      try:
+         # `check_same_thread` is off because queries are serialized by `_lock`
+         self._connection = sqlite3.connect(
+            f"file:{path}?mode=ro", uri=True, check_same_thread=False
+         )
+         header = self._connection.execute("SELECT version, digest FROM meta").fetchone()
+      except sqlite3.Error as e:
+         raise ParadigmStoreError(f"can't read {path}: {e!r}") from e
+      if header != (STORE_VERSION, digest):
+         self._connection.close()
+         raise ParadigmStoreError(f"{path} is stale")
+      self._lock = Lock()
+
+   def get(
+      self,
+      inner_key:str,
+      entry_index:int,
+      variant:int,
+      yat:str
+   ) -> Optional[List[Tuple[str, List[str]]]]:
+      """The paradigm as `PartOfSpeech.multiforms` returns it, None if there's none"""
+      with self._lock:
+         row = self._connection.execute(
+            "SELECT cells FROM paradigms "
+            "WHERE inner_key = ? AND entry_index = ? AND variant = ? AND yat = ?",
+            (inner_key, entry_index, variant, yat)
+         ).fetchone()
+      if row is None:
+         return None
+      return [(label, forms) for label, forms in json.loads(row[0])]
+
+   def __len__(self) -> int:
+      with self._lock:
+         return self._connection.execute("SELECT COUNT(*) FROM paradigms").fetchone()[0]
@@ -0,0 +1,25 @@
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+class PrefixIndex:
+   """
+   Finds outer keys by their beginning, e.g. for autocompletion.
+   Keeps a sorted list of outer keys for every yat mode, so that all keys
+   with a given prefix form a contiguous slice that can be found by bisection.
+   """
+   def __init__(self, keys_with_modes:Iterable[Tuple[str, str]]) -> None:
+      self._keys: Dict[str, List[str]] = {}
+      for key, input_yat in keys_with_modes:
+         self._keys.setdefault(input_yat, []).append(key)
+      for keys in self._keys.values():
+         keys.sort()
+
+   def complete(self, prefix:str, input_yat:str, limit:int) -> List[str]:
+      keys = self._keys.get(input_yat, [])
+      start = bisect_left(keys, prefix)
+      result = []
+      for key in keys[start:start+limit]:
+         if not key.startswith(prefix):
+            break
+         result.append(key)
+      return result
@@ -0,0 +1,49 @@
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class KeySampler:
+   """
+   Picks random keys without copying them on every call: the keys are put
+   into lists once, and a random element of a list is found in constant time.
+   """
+   def __init__(
+      self,
+      keys_with_modes:Iterable[Tuple[str, str]],
+      entries_with_types:Iterable[Tuple[Tuple[str, int], str]]
+   ) -> None:
+      """
+      `keys_with_modes`: (outer key, yat mode) pairs
+      `entries_with_types`: ((inner key, entry index), entry type) pairs
+      """
+      self._outer_keys = list(keys_with_modes)
+      # part of speech as in data.yml (N, V, A, B) -> entries
+      self._entries: Dict[str, List[Tuple[str, int]]] = {}
+      for entry, kind in entries_with_types:
+         self._entries.setdefault(kind.split("\\")[0], []).append(entry)
+
+   def outer(self) -> Tuple[str, str]:
+      """Every spelling is equally likely"""
+      return random.choice(self._outer_keys)
+
+   def entry(self, pos_weights:Optional[Dict[str, float]]=None) -> Tuple[str, int]:
+      """
+      Returns (inner key, entry index), every entry is equally likely.
+      With `pos_weights`, e.g. {"V": 2, "N": 1}, a part of speech is chosen
+      first according to the weights, and then an entry of that part of
+      speech. Parts of speech without a weight are never chosen.
+      """
+      groups: List[List[Tuple[str, int]]] = []
+      weights: List[float] = []
+      if pos_weights is None:
+         groups = list(self._entries.values())
+         weights = [len(group) for group in groups]
+      else:
+         for pos, weight in pos_weights.items():
+            if self._entries.get(pos) and weight > 0:
+               groups.append(self._entries[pos])
+               weights.append(weight)
+      if not groups:
+         raise IndexError("no entries to choose from")
+      # there are only a few parts of speech, so this is still constant time
+      group = random.choices(groups, weights)[0]
+      return random.choice(group)
@@ -0,0 +1,58 @@
+"""
+A binary snapshot of the fully built FancyLookup.
+
+Building the lookup from data.yml means parsing the whole YAML file and
+calculating every outer key of every word, which takes seconds. The snapshot
+stores the result of that work in a pickle file, so that a fresh process can
+load it in milliseconds. A snapshot is only valid for the exact data.yml it was
+built from (we store a hash of the file) and for the exact snapshot format
+(we store SNAPSHOT_VERSION, bump it whenever FancyLookup changes).
+"""
+
+from hashlib import sha256
+import pickle
+from typing import Any, NamedTuple
+from .multidict import FancyLookup
+
+SNAPSHOT_VERSION = 5
+
+class SnapshotError(Exception):
+   """The snapshot is missing, stale or unreadable."""
+
+class SnapshotHeader(NamedTuple):
+   version: int
+   digest: str
+
+def file_digest(path:str) -> str:
+   with open(path, "rb") as f:
+      return sha256(f.read()).hexdigest()
+
+def save_checked(obj:Any, path:str, digest:str) -> None:
+   """Pickles `obj` together with the current SNAPSHOT_VERSION and `digest`"""
+   with open(path, "wb") as f:
+      # the header is pickled separately so that we can check it
+      # without unpickling the whole object
+      pickle.dump(SnapshotHeader(SNAPSHOT_VERSION, digest), f, pickle.HIGHEST_PROTOCOL)
+      pickle.dump(obj, f, pickle.HIGHEST_PROTOCOL)
+
+def load_checked(path:str, digest:str) -> Any:
+   """Unpickles what `save_checked` has saved if the version and `digest` match"""
+   try:
+      with open(path, "rb") as f:
+         header = pickle.load(f)
+         if header != (SNAPSHOT_VERSION, digest):
+            raise SnapshotError(f"{path} is stale")
+         return pickle.load(f)
+   except SnapshotError:
+      raise
+   except Exception as e: # missing file, truncated file, renamed classes etc.
+      raise SnapshotError(f"can't load {path}: {e!r}") from e
+
+def save_snapshot(lookup:FancyLookup, path:str, digest:str) -> None:
+   save_checked(lookup, path, digest)
+
+def load_snapshot(path:str, digest:str) -> FancyLookup:
+   result = load_checked(path, digest)
+   if not isinstance(result, FancyLookup):
+      raise SnapshotError(f"{path} doesn't contain a FancyLookup")
+   return result
@@ -1,17 +1,18 @@
 from re import sub as rsub, search as rsearch
 from typing import Callable, Dict, List, Iterator, Optional, Tuple
 
-from .paradigms import c_m, c_f, c_n, NounStem, male_gen_pl_marked, female_gen_pl_i
+from .paradigms import (
+   compiled_c_m, compiled_c_f, compiled_c_n, male_gen_pl_marked, female_gen_pl_i
+)
 from ..charutils import cmacron, cstraight
 from ..paradigm_helpers import (
-   AccentedTuple, MorphemeChain, uniq, nice_name, oa,
-   accentize, append_def, has
+   AccentedTuple, CompiledEnding, LabelFilter, MorphemeChain, oa,
+   accentize, append_def, compile_chain, has, nice_name
 )
-from ..pos import PartOfSpeech, Replacement
-from ..table import LabeledMultiform
+from ..pos import PartOfSpeech, RawMultiform, Replacement
 from ..utils import (
    deyerify, decurlyerify, purify, ungarde, compose1, indices, insert, garde,
-   expose, last_vowel_index, first_vowel_index, expose_replacement, swap
+   last_vowel_index, first_vowel_index, swap
 )
 
 
@@ -50,6 +51,8 @@ noun_gpl_transform: Callable[[str], str] = compose1(
 
 
 class Noun(PartOfSpeech):
+   __slots__ = ("trunk", "anim", "suff")
+
    def __init__(
       self,
       key:str,
@@ -70,10 +73,6 @@ class Noun(PartOfSpeech):
          self.suff = append_def(self.suff, params, ['+', '±'], '_')
          self.anim = append_def(self.anim, params, ['an'], 'in')
 
-   @staticmethod
-   def _expose(form:str, yat:str="e", latin:bool=False) -> str:
-      return expose(form, yat, latin)
-
    def _trunk(self) -> List[str]:
       result = []
       keys = self.accented_keys
@@ -148,7 +147,7 @@ class Noun(PartOfSpeech):
       self,
       stem:str,
       morpheme:str,
-      accent:str,
+      accented:bool,
       current_AP:str
    ) -> List[List[str]]:
       """
@@ -186,13 +185,13 @@ class Noun(PartOfSpeech):
          if self.label('m'):
             if (
                has(stem, 'ъ', 'ꚜ') and
-               current_AP in accent and
+               accented and
                current_AP == 'b:'
             ):
                retraction = [2, 1] #  Макѐдо̄на̄ца̄ & Македóна̄ца̄
             elif (
                has(stem, 'ъ', 'ꚜ') and
-               current_AP in accent and
+               accented and
                current_AP in ('a:', 'c:', 'f.')
             ):
                retraction = [2] # но̏ва̄ца̄
@@ -201,7 +200,7 @@ class Noun(PartOfSpeech):
             elif (
                pvi is not None and
                not has(stem, 'ъ', 'ꚜ') and
-               current_AP not in accent
+               not accented
             ):
                if current_AP == 'a.':
                   retraction = [1] # је̏зӣка̄
@@ -215,7 +214,7 @@ class Noun(PartOfSpeech):
             if (
                pvi is not None and
                not has(stem, 'ъ', 'ꚜ') and
-               current_AP not in accent and
+               not accented and
                current_AP not in ('a¡',)
             ):
                retraction = [1] # па̏ртӣја̄
@@ -266,9 +265,8 @@ class Noun(PartOfSpeech):
       self,
       i:int,
       length_inconstant:bool,
-      yat:str="e",
-      latin:bool=False
-   ) -> Iterator[LabeledMultiform]:
+      wanted:LabelFilter=LabelFilter()
+   ) -> Iterator[RawMultiform]:
       """
       Takes the SELF (i.e. whole info about the word) with additional parameters
       and produces the whole inflection table, yielding form by form.
@@ -277,23 +275,25 @@ class Noun(PartOfSpeech):
 
       start_AP = self.gram.AP[i].replace('?', '.')
 
+      AP = self.gram.AP[i]
       declension_is_regular: bool = True
+      endings: Tuple[CompiledEnding, ...] = ()
       if self.label("m"):
-         lbld_endings = c_m(self.trunk[i], self.suff[i], self.anim[i]).labeled_endings
+         endings = compiled_c_m(self.trunk[i], self.suff[i], self.anim[i], AP)
       elif self.label("n"): # TODO vreme-ime
-         lbld_endings = c_n().labeled_endings
+         endings = compiled_c_n(AP)
       elif self.label("f"):
          ends_with_a = self.accented_keys[i].endswith('а')
-         lbld_endings = c_f(ends_with_a).labeled_endings
+         endings = compiled_c_f(ends_with_a, AP)
       else:
-         lbld_endings = iter([])
          declension_is_regular = False
 
-      if self.label("f") and self.gram.MP[i]: # processing GPl like magli (not **magala)
+      # processing GPl like magli (not **magala)
+      if self.label("f") and self.gram.MP[i] and wanted(nice_name("pl gen")):
          form_with_i = [
             noun_gpl_transform(x)
             for x in
-            self.process_one_form(self.gram.AP[i], self.trunk[i], female_gen_pl_i)
+            self.process_one_form(AP, self.trunk[i], compile_chain(female_gen_pl_i, AP).morphemes)
          ] # curly yer must be deleted BEFORE general deyerifying, so mind the order
          if "i" in self.gram.MP[i]:
             self.replacements["pl gen"] = form_with_i
@@ -301,24 +301,22 @@ class Noun(PartOfSpeech):
             self.amendments["pl gen"] = form_with_i
 
       if declension_is_regular:
-         for label, ending in lbld_endings:
-            if label in self.replacements:
-               result = [
-                  expose_replacement(form, yat, latin)
-                  for form in
-                  self.replacements[label]
-               ]
-               yield nice_name(label), uniq(result)
+         for label, name, chains in endings:
+            if not wanted(name):
+               continue
+
+            elif label in self.replacements:
+               yield RawMultiform(name, [], [], self.replacements[label])
 
             else:
                ready_forms: List[str] = [] # TODO: better name
 
                # swapping length in case it is necessary
-               to_swap_or_not = ('ø' not in ending[0][0].morpheme and '.' in start_AP)
-               noun_form = self.swap(self.trunk[i], to_swap_or_not, self.gram.AP[i], start_AP)
+               to_swap_or_not = ('ø' not in chains[0].morphemes[0].morpheme and '.' in start_AP)
+               noun_form = self.swap(self.trunk[i], to_swap_or_not, AP, start_AP)
 
                # after that, iterating by ending variation
-               for ending_variation in ending:
+               for ending_variation in chains:
                   # processing words like bo / bol (marked with ʟ)
                   if 'ʟ' in noun_form:
                      noun_variants = [noun_form.replace('ʟ', 'ʌ'), noun_form.replace('ʟ', 'л')]
@@ -329,7 +327,7 @@ class Noun(PartOfSpeech):
                   elif 'ꙏ' in noun_form:
                      noun_variants = [noun_form.replace('ꙏ', 'ъ'), decurlyerify(noun_form)]
                   # processing forms like akcenat/akcent (marked with Ъ)
-                  elif 'Ъ' in noun_form and 'ø' in ending_variation[0].morpheme:
+                  elif 'Ъ' in noun_form and 'ø' in ending_variation.morphemes[0].morpheme:
                      noun_variants = [noun_form.replace('Ъ', ''), noun_form.replace('Ъ', 'ꚜ')]
                   else:
                      noun_variants = [noun_form.replace('Ъ', 'ꚜ')]
@@ -338,48 +336,30 @@ class Noun(PartOfSpeech):
 
                   for noun_variant in noun_variants:
                      if self._noun_form_is_possible(
-                        noun_variant, ending_variation, self.gram.AP[i]
+                        noun_variant, ending_variation.source, AP
                      ):
                         new_ready_form = self.process_one_form(
-                           self.gram.AP[i], noun_variant, ending_variation
+                           AP, noun_variant, ending_variation.morphemes
                         )
                         ready_forms += new_ready_form
 
-               if label in self.amendments:
-                  ready_forms += [
-                     expose_replacement(w_form, yat, latin)
-                     for w_form in self.amendments[label]
-                  ]
-
-               result = [self._expose(form, yat, latin) for form in ready_forms]
-               yield nice_name(label), uniq(result)
+               yield RawMultiform(name, ready_forms, self.amendments.get(label, []))
 
       else:
          for label, am_forms in self.amendments.items():
-            result = [
-               self._expose(form, yat, latin)
-               for form in
-               [expose_replacement(form, yat, latin) for form in am_forms]
-            ]
-            yield nice_name(label), uniq(result)
+            if wanted(nice_name(label)):
+               yield RawMultiform(nice_name(label), [], am_forms)
 
 
-   def multiforms(
+   def _raw_multiforms(
       self,
-      *,
       variant:Optional[int]=None,
-      yat:str="e",
-      latin:bool=False
-   ) -> Iterator[LabeledMultiform]:
+      wanted:LabelFilter=LabelFilter()
+   ) -> Iterator[RawMultiform]:
       """decline
       Launch _paradigm_to_forms as many times as needed,
       i.e. as many different accentuations a word has.
       """
       for i, _ in enumerate(self.gram.AP):
          if not (variant is not None and variant != i):
-            yield from self._paradigm_to_forms(
-               i=i,
-               length_inconstant=False,
-               yat=yat,
-               latin=latin
-            )
+            yield from self._paradigm_to_forms(i=i, length_inconstant=False, wanted=wanted)
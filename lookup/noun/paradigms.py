@@ -1,6 +1,7 @@
-from typing import Dict, NamedTuple, List, Iterator
+from functools import lru_cache
+from typing import Dict, NamedTuple, List, Iterator, Tuple
 from ..paradigm_helpers import (
-   AccentedTuple, nice_name, MorphemeChain, LabeledEnding
+   AccentedTuple, CompiledEnding, nice_name, MorphemeChain, LabeledEnding, compile_endings
 )
 from ..charutils import cmacron
 from ..utils import last_vowel_index
@@ -78,68 +79,105 @@ def m_plural(suff:str = '_') -> List[List[MorphemeChain]]:
       raise NotImplementedError("Unknown paradigm")
 
 
-def m_instr(stem: str) -> List[List[AccentedTuple]]:
-   lvi = last_vowel_index(stem)
+_m_instr_endings = {
+   "em": [AccentedTuple('е·м', 'b.b:b?e:f.q.')],
+   "om": [AccentedTuple('о·м', 'b.b:b?e:f.q.')]
+}
 
-   em = [AccentedTuple('е·м', 'b.b:b?e:f.q.')]
-   om = [AccentedTuple('о·м', 'b.b:b?e:f.q.')]
+def _m_instr_keys(stem: str) -> Tuple[str, ...]:
+   lvi = last_vowel_index(stem)
 
    if lvi is None:
-      result = [om]
+      return ("om",)
    elif stem.endswith('ʲ') or stem.endswith('тељ') and not stem.endswith('ирʲ'): # пријатељ, сир
-      result = [em, om] # плашт, дажд, пут, нос, курс, појас, цар
+      return ("em", "om") # плашт, дажд, пут, нос, курс, појас, цар
    elif stem.endswith('ъц'): # отац, палац
-      result = [em]
+      return ("em",)
    elif stem[-1] in 'чџшжјљњ':
       if stem[lvi] == 'е':
-         result = [om, em] # лавеж, кеј, Беч
+         return ("om", "em") # лавеж, кеј, Беч
       else:
-         result = [em] # кључ
+         return ("em",) # кључ
    elif stem[-1] in 'њљћђ': # коњ
-      result = [em]
+      return ("em",)
    else:
-      result = [om]
-   return result
+      return ("om",)
 
-def m_voc(stem: str, anim: str) -> List[List[AccentedTuple]]:
-   u = [AccentedTuple('у0·', 'b.b:b?c:c?b0d:e:f.q.')]
-   e = [AccentedTuple('ʺе0·', 'b.b:b?c:c?b0d:e:f.q.')]
+def m_instr(stem: str) -> List[List[AccentedTuple]]:
+   return [_m_instr_endings[key] for key in _m_instr_keys(stem)]
+
+_m_voc_endings = {
+   "u": [AccentedTuple('у0·', 'b.b:b?c:c?b0d:e:f.q.')],
+   "e": [AccentedTuple('ʺе0·', 'b.b:b?c:c?b0d:e:f.q.')]
+}
 
+def _m_voc_keys(stem: str, anim: str) -> Tuple[str, ...]:
    if stem.endswith('рʲ'): # цар
-      return [u, e]
+      return ("u", "e")
    if stem[-1] in 'јљњђћчшжџ': # гај
-      return [u]
+      return ("u",)
    elif (
       stem.endswith('ък') and
       stem[-3] in 'тдчсшзж'
    ): # редак
-      return [u]
+      return ("u",)
    elif stem.endswith(f'е·{cmacron}з'): # Кинез
-      return [u]
+      return ("u",)
    elif (
       stem[-1] in 'кгх' and 
       stem[-2] != 'ъ' and
       anim == 'in'
    ): # ковчег, лек, смех, прах
-      return [u, e]
+      return ("u", "e")
    else:
-      return [e]
+      return ("e",)
 
-def c_m(stem: str, suff: str, anim: str) -> NounStem:
+def m_voc(stem: str, anim: str) -> List[List[AccentedTuple]]:
+   return [_m_voc_endings[key] for key in _m_voc_keys(stem, anim)]
+
+def _c_m(
+   suff: str,
+   anim: str,
+   instr: List[MorphemeChain],
+   voc: List[MorphemeChain]
+) -> NounStem:
    m_singular_ = [
          [[AccentedTuple('ø·', 'b.b:b?e:f.q.')]],
    m_anim_dict['sg_acc'][anim],
    [[AccentedTuple('а·', 'b.b:b?e:f.q.')]],
    [[AccentedTuple('у·', 'b.b:b?e:f.q.')]],
-   m_instr(stem),
+   instr,
    m_anim_dict['sg_loc'][anim],
-   m_voc(stem, anim)
+   voc
    ]
 
    m_plural_ = m_plural(suff)
    declension = m_singular_ + m_plural_
    return NounStem(*declension)
 
+def c_m(stem: str, suff: str, anim: str) -> NounStem:
+   return _c_m(suff, anim, m_instr(stem), m_voc(stem, anim))
+
+@lru_cache(maxsize=None)
+def _compiled_c_m(
+   suff: str,
+   anim: str,
+   instr: Tuple[str, ...],
+   voc: Tuple[str, ...],
+   AP: str
+) -> Tuple[CompiledEnding, ...]:
+   return compile_endings(_c_m(
+      suff,
+      anim,
+      [_m_instr_endings[key] for key in instr],
+      [_m_voc_endings[key] for key in voc]
+   ).labeled_endings, AP)
+
+def compiled_c_m(stem: str, suff: str, anim: str, AP: str) -> Tuple[CompiledEnding, ...]:
+   """The same as c_m, compiled for `AP`"""
+   # the stem only matters for choosing some endings, so we cache by the choice
+   return _compiled_c_m(suff, anim, _m_instr_keys(stem), _m_voc_keys(stem, anim), AP)
+
 
 f_declension_a = [
    [[AccentedTuple('а·', 'b.b:c.c:g.g:')]],
@@ -198,4 +236,12 @@ def c_n() -> NounStem:
       [[AccentedTuple('ʹи·ма', 'b.b:b0c.c:')]],
       [[AccentedTuple('ʹи·ма', 'b.b:b0c.c:')]],
       [[AccentedTuple('а·', 'b.c.c:')]]
-   )
\ No newline at end of file
+   )
+
+@lru_cache(maxsize=None)
+def compiled_c_f(a:bool, AP:str) -> Tuple[CompiledEnding, ...]:
+   return compile_endings(c_f(a).labeled_endings, AP)
+
+@lru_cache(maxsize=None)
+def compiled_c_n(AP:str) -> Tuple[CompiledEnding, ...]:
+   return compile_endings(c_n().labeled_endings, AP)
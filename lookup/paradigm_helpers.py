@@ -1,7 +1,7 @@
-from typing import Dict, List, Optional, Generic, Iterable, Tuple, TypeVar, Union
-from collections import OrderedDict
+from typing import (
+   Dict, List, NamedTuple, Optional, Iterable, Tuple, TypeVar, Union
+)
 from dataclasses import dataclass
-from itertools import repeat
 from re import compile as rcompile
 from .charutils import cring, real_accent
 
@@ -48,8 +48,12 @@ def accentize(word:str) -> str: # traditional accentuation
       word = word.replace(k, v)
    return word
 
+# Instances of the classes below are created for every word, so they have
+# no __dict__, only __slots__ (not `dataclass(slots=True)`, which needs 3.10).
+
 @dataclass
 class Accents:
+   __slots__ = ("r", "v")
    r: Dict[int, str] # syllabic r
    v: Dict[int, str] # any other vowel
 
@@ -79,6 +83,8 @@ class GramInfo:
    reflexive) and one of "Pf", "Ipf", "Dv" (perfective, imperfective,
    biaspectual; abbreviation "Dv" comes from "dvòvīdan")
    """
+   __slots__ = ("AP", "MP", "comment", "POS", "other")
+
    def __init__(self, kind:str, infos:List[str]) -> None:
       # accents = []
       self.AP: List[str] = [] # accent paradigm
@@ -122,6 +128,7 @@ class GramInfo:
 
 @dataclass
 class AccentedTuple:
+   __slots__ = ("morpheme", "accent")
    morpheme: str
    accent: str
 
@@ -129,19 +136,64 @@ MorphemeChain = List[AccentedTuple]
 # the name sounds promising, but those "chains" are unlikely to be longer than two morphemes
 LabeledEnding = Tuple[str, List[MorphemeChain]]
 
-class OrderedSet(OrderedDict, Generic[T]):
-   def __init__(self, i:Iterable[T]) -> None:
-      super().__init__(zip(i, repeat(None)))
+# Endings are compiled for one accent paradigm before generating forms,
+# so that generating doesn't search for the AP in `accent` over and over.
+# The compiled endings are cached by every part of speech, see e.g.
+# verb.paradigms.compiled_verb_endings.
 
-   def __repr__(self) -> str:
-      return f"OrderedSet({list(self)})"
+class CompiledMorpheme(NamedTuple):
+   morpheme: str
+   accented: bool # whether the AP is in AccentedTuple.accent
+
+class CompiledChain(NamedTuple):
+   morphemes: Tuple[CompiledMorpheme, ...]
+   source: MorphemeChain # for rules that need to know which ending it is
+
+class CompiledEnding(NamedTuple):
+   label: str # as in the paradigm
+   name: str # nice_name(label), as in the tables
+   chains: Tuple[CompiledChain, ...]
+
+def compile_chain(chain:MorphemeChain, AP:str) -> CompiledChain:
+   return CompiledChain(
+      tuple(CompiledMorpheme(part.morpheme, AP in part.accent) for part in chain),
+      chain
+   )
+
+def compile_endings(
+   labeled_endings:Iterable[LabeledEnding],
+   AP:str
+) -> Tuple[CompiledEnding, ...]:
+   return tuple(
+      CompiledEnding(
+         label, nice_name(label), tuple(compile_chain(chain, AP) for chain in ending)
+      )
+      for label, ending in labeled_endings
+   )
+
+class LabelFilter:
+   """
+   Which labels are wanted. With `queries`, e.g. ["sg nom", "infinitive"],
+   the labels that contain all words of at least one query (like in
+   Table.__getitem__), without them all labels.
+   """
+   def __init__(self, queries:Optional[Iterable[str]]=None) -> None:
+      self._queries = None if queries is None else [set(query.split()) for query in queries]
+
+   def __call__(self, label:str) -> bool:
+      if self._queries is None:
+         return True
+      words = set(label.split())
+      return any(query <= words for query in self._queries)
 
 def uniq(i:Iterable[T]) -> List[T]:
-   return list(OrderedSet(i))
+   """The unique elements in the order they first appear (dicts keep the order)"""
+   return list(dict.fromkeys(i))
 
 
 @dataclass
 class TableCaption:
+   __slots__ = ("caption", "par", "subpar", "full_caption")
    caption: str
    par: str
    subpar: str
@@ -1,6 +1,8 @@
-from typing import Dict, List, Tuple
-from .paradigm_helpers import AccentedTuple, GramInfo, MorphemeChain, oa
-from .utils import first_vowel_index, last_vowel_index, insert
+from importlib import import_module
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Type
+from .paradigm_helpers import CompiledMorpheme, GramInfo, LabelFilter, oa, uniq
+from .table import LabeledMultiform, to_latin
+from .utils import expose_many_yats, expose_replacement, first_vowel_index, last_vowel_index, insert
 from .charutils import all_vowels, cstraight, cmacron, cring
 from .data.multidict import Replacement
 
@@ -22,7 +24,25 @@ def _swap(trunk:str) -> str:
 
    return trunk
 
+class RawMultiform(NamedTuple):
+   """
+   A multiform before exposing, which doesn't depend on the yat mode.
+   `label` is already as in the tables (see nice_name).
+   Unless there are `replacements` (then only they are used),
+   the forms are `forms` and `amendments` (exposed with `expose_replacement` first).
+   """
+   label: str
+   forms: List[str]
+   amendments: List[str]
+   replacements: Optional[List[str]] = None
+
 class PartOfSpeech():
+   # an instance is created for every entry that is looked up, so no __dict__
+   __slots__ = (
+      "accented_keys", "kind", "_is_verb", "_has_syllabic_r",
+      "key", "gram", "replacements", "amendments"
+   )
+
    def __init__(
       self,
       key:str,
@@ -34,6 +54,9 @@ class PartOfSpeech():
    ) -> None:
       self.accented_keys = accented_keys.split(",")
       self.kind = kind
+      # these are needed for every morpheme, so they are found out once
+      self._is_verb = kind.startswith('V')
+      self._has_syllabic_r = self._is_verb and len(kind.split("\\")) > 3
       self.key = key.split('\\')[0]
       self.gram = GramInfo(kind, info.split(';'))
       self.replacements: Dict[str, List[str]] = dict(replacements)
@@ -41,6 +64,99 @@ class PartOfSpeech():
       if len(self.accented_keys) == 1 and len(self.gram.AP) > 1:
          self.accented_keys *= len(self.gram.AP)
 
+   def _raw_multiforms(
+      self,
+      variant:Optional[int]=None,
+      wanted:LabelFilter=LabelFilter()
+   ) -> Iterator[RawMultiform]:
+      """
+      Implemented by every concrete part of speech.
+      The same for every yat mode, see `multiforms_by_yat`.
+      Labels that aren't `wanted` are skipped before generating their forms.
+      """
+      raise NotImplementedError
+
+   def _exposed_suffix(self) -> str:
+      """Appended to every generated form after exposing (in Cyrillic)"""
+      return ""
+
+   def raw_multiforms(
+      self,
+      variant:Optional[int]=None,
+      forms:Optional[Iterable[str]]=None
+   ) -> List[RawMultiform]:
+      """
+      The multiforms before exposing. Generating them is much cheaper than
+      exposing, so this is also a cheap way to learn the labels.
+      With `forms`, only the matching labels, see LabelFilter.
+      """
+      return list(self._raw_multiforms(variant, LabelFilter(forms)))
+
+   def expose_raw(
+      self,
+      raw:List[RawMultiform],
+      yats:Sequence[str]=("e", "je", "ije"),
+      latin:bool=False
+   ) -> Dict[str, List[LabeledMultiform]]:
+      """
+      Exposes `raw` for several yat modes, e.g. {"e": [...], "ije": [...]}.
+      The forms of all labels are exposed together, which is much faster
+      than label by label. Latin forms are transliterated from the Cyrillic
+      ones, so that both scripts share the expose cache.
+      """
+      exposed = expose_many_yats(
+         [form for multiform in raw if multiform.replacements is None
+          for form in multiform.forms],
+         yats
+      )
+      suffix = self._exposed_suffix()
+      result: Dict[str, List[LabeledMultiform]] = {}
+      for yat in yats:
+         generated = iter(exposed[yat])
+         amended = iter(expose_many_yats(
+            [expose_replacement(form, yat) for multiform in raw
+             if multiform.replacements is None for form in multiform.amendments],
+            (yat,)
+         )[yat])
+         multiforms: List[LabeledMultiform] = []
+         for label, forms, amendments, replacements in raw:
+            if replacements is None:
+               forms = [next(generated) + suffix for _ in forms]
+               forms += [next(amended) + suffix for _ in amendments]
+            else:
+               forms = [expose_replacement(form, yat) for form in replacements]
+            multiforms.append((label, uniq(forms)))
+         result[yat] = to_latin(multiforms) if latin else multiforms
+      return result
+
+   def multiforms_by_yat(
+      self,
+      *,
+      variant:Optional[int]=None,
+      yats:Sequence[str]=("e", "je", "ije"),
+      latin:bool=False,
+      forms:Optional[Iterable[str]]=None
+   ) -> Dict[str, List[LabeledMultiform]]:
+      """
+      The multiforms for several yat modes, e.g. {"e": [...], "ije": [...]}.
+      The paradigm is only generated once for all of them.
+      With `forms`, e.g. ["sg nom", "sg gen"], only the matching labels are
+      generated (see LabelFilter), which is much faster than all of them.
+      """
+      return self.expose_raw(self.raw_multiforms(variant, forms), yats, latin)
+
+   def multiforms(
+      self,
+      *,
+      variant:Optional[int]=None,
+      yat:str="e",
+      latin:bool=False,
+      forms:Optional[Iterable[str]]=None
+   ) -> Iterator[LabeledMultiform]:
+      yield from self.multiforms_by_yat(
+         variant=variant, yats=(yat,), latin=latin, forms=forms
+      )[yat]
+
    def label(self, lbl: str) -> bool:
       return lbl in self.gram.other
 
@@ -68,7 +184,7 @@ class PartOfSpeech():
       self,
       stem:str,
       morpheme:str,
-      accent:str,
+      accented:bool,
       current_AP:str
    ) -> List[List[str]]:
       """
@@ -81,7 +197,7 @@ class PartOfSpeech():
       self,
       current_AP:str,
       stem:str,
-      ending_part:AccentedTuple
+      ending_part:CompiledMorpheme
    ) -> List[List[str]]:
 
       """
@@ -91,8 +207,8 @@ class PartOfSpeech():
       """
 
       # processing syllable 'r'
-      morpheme, accent = ending_part.morpheme, ending_part.accent
-      if self.kind.startswith('V') and len(self.kind.split("\\")) > 3:
+      morpheme, accented = ending_part
+      if self._has_syllabic_r:
          stem_ = stem.replace(cmacron, '')
          morpheme_ = ''.join([x for x in morpheme if x.isalpha() and x not in "ʹʺ"])
          if stem_[-1] == 'р' and stem_[-2] not in all_vowels and morpheme_:
@@ -105,7 +221,7 @@ class PartOfSpeech():
                stem = stem[:-1]
 
       # declickify (ʘ) -- special double '0' in nesti-verbs
-      if self.kind.startswith('V'):
+      if self._is_verb:
          if current_AP in 'eʹxʺ':
             morpheme = morpheme.replace('ʘ', '')
       morpheme = morpheme.replace('ʘ', '0')
@@ -115,7 +231,7 @@ class PartOfSpeech():
          morpheme = morpheme.replace('>>', '')
 
       # deleting the first of two accents (is it OK to have it here?)
-      if current_AP in accent and cstraight in stem:
+      if accented and cstraight in stem:
          stem = stem.replace(cstraight, '')
 
       # first we delete '>' (= delete all macrons in the word)
@@ -123,13 +239,13 @@ class PartOfSpeech():
          morpheme = morpheme.replace('>', '')
 
       # then we delete '<' (= lengthen the last vowel in the stem)
-      return self._delete_left_bracket(stem, morpheme, accent, current_AP)
+      return self._delete_left_bracket(stem, morpheme, accented, current_AP)
 
    def _append_morpheme(
       self,
       current_AP:str,
       stems:List[str],
-      ending_part:AccentedTuple
+      ending_part:CompiledMorpheme
    ) -> List[str]:
 
       connectenda: List[List[str]] = []
@@ -149,7 +265,7 @@ class PartOfSpeech():
 
       for (base, aff) in connectenda:
          # accentizing endings (?)
-         if current_AP in ending_part.accent:
+         if ending_part.accented:
             if cstraight in base and not '0' in aff:
                # e.g. ['Аргенти̍·̄на̄ц', 'а̄'] or ['вр̥х>œ̍̄в', 'а̄']
                aff = aff.replace('·', '')
@@ -184,7 +300,7 @@ class PartOfSpeech():
       self,
       current_AP:str,
       stem:str,
-      morphChain:MorphemeChain,
+      morphChain:Sequence[CompiledMorpheme],
       iterative:bool=True
    ) -> List[str]:
 
@@ -206,3 +322,26 @@ class PartOfSpeech():
          result = self._append_morpheme(current_AP, iterable_form, morphChain[0])
          return result
       # TODO apparently morphChain is of len 1, but what if it's not?
+
+
+# concrete parts of speech are imported on first use, see `part_of_speech`
+_pos_classes: Dict[str, Tuple[str, str]] = {
+   "V": ("verb", "Verb"),
+   "A": ("adjective", "Adjective"),
+   "N": ("noun", "Noun"),
+   "B": ("adverb", "Adverb")
+}
+
+def part_of_speech(kind:str) -> Optional[Type[PartOfSpeech]]:
+   POS = kind.split('\\')[0]
+   # TODO: it gets calculated doubly here and inside concrete classes, rethink
+
+   try:
+      module_name, class_name = _pos_classes[POS]
+   except KeyError:
+      return None # TODO other parts of speech
+   return getattr(import_module(f".{module_name}", __package__), class_name)
+
+def all_parts_of_speech() -> List[Type[PartOfSpeech]]:
+   return [getattr(import_module(f".{module_name}", __package__), class_name)
+           for module_name, class_name in _pos_classes.values()]
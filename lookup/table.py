@@ -1,24 +1,103 @@
 from __future__ import annotations
-from typing import Iterable, Iterator, List, Tuple, Union
+from typing import (
+   Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+)
 from .paradigm_helpers import TableCaption
+from .utils import cyr2lat
 
 Form = str
 Multiform = List[Form]
 LabeledMultiform = Tuple[str, Multiform]
 
+def to_latin(multiforms:Iterable[LabeledMultiform]) -> List[LabeledMultiform]:
+   """The same multiforms with their forms (not labels) in Latin script"""
+   multiforms = list(multiforms)
+   # one translate for all forms is faster than one per form
+   forms = iter(cyr2lat("\n".join(
+      form for _, multiform in multiforms for form in multiform
+   )).split("\n"))
+   return [(label, [next(forms) for _ in multiform]) for label, multiform in multiforms]
+
+class Cells:
+   """
+   The cells of a table, which are only computed when they are needed.
+   The labels are known right away, `compute(indices)` returns the multiforms
+   of the cells with these indices. Computed multiforms are remembered.
+   """
+   __slots__ = ("labels", "_compute", "_multiforms", "_index")
+
+   def __init__(
+      self,
+      labels:List[str],
+      compute:Callable[[List[int]], List[Multiform]]
+   ) -> None:
+      self.labels = labels
+      self._compute = compute
+      self._multiforms: Dict[int, Multiform] = {}
+      self._index: Optional[Dict[str, Set[int]]] = None
+
+   def find(self, tokens:List[str]) -> Set[int]:
+      """Indices of the cells whose labels contain all `tokens`, e.g. ["sg", "nom"]"""
+      if self._index is None:
+         # label token -> indices of the cells with it, built on the first query
+         self._index = {}
+         for i, label in enumerate(self.labels):
+            for token in label.split():
+               self._index.setdefault(token, set()).add(i)
+      if not tokens:
+         return set(range(len(self.labels)))
+      return set.intersection(*(self._index.get(token, set()) for token in tokens))
+
+   @classmethod
+   def ready(cls, data:Iterable[LabeledMultiform]) -> Cells:
+      """Cells that are already computed"""
+      cells = cls([], lambda indices: [])
+      for i, (label, multiform) in enumerate(data):
+         cells.labels.append(label)
+         cells._multiforms[i] = multiform
+      return cells
+
+   def multiforms(self, indices:Sequence[int]) -> List[Multiform]:
+      missing = [i for i in indices if i not in self._multiforms]
+      if missing:
+         self._multiforms.update(zip(missing, self._compute(missing)))
+      return [self._multiforms[i] for i in indices]
+
 class Table:
-   def __init__(self, pos:str, caption:TableCaption, data:Iterable[LabeledMultiform]) -> None:
+   __slots__ = ("caption", "pos", "_cells", "_indices", "_has_all_cells")
+
+   def __init__(
+      self,
+      pos:str,
+      caption:TableCaption,
+      data:Union[Iterable[LabeledMultiform], Cells],
+      indices:Optional[List[int]]=None
+   ) -> None:
+      """
+      `data` are either the cells themselves or `Cells` that compute them
+      on demand; `indices` are the cells of `data` that belong to this table
+      (by default all of them).
+      """
       self.caption = caption
       self.pos = pos
-      self._data = list(data)
+      self._cells = data if isinstance(data, Cells) else Cells.ready(data)
+      # the indices are always in ascending order
+      self._indices = list(range(len(self._cells.labels))) if indices is None else indices
+      self._has_all_cells = indices is None
+
+   @property
+   def _data(self) -> List[LabeledMultiform]:
+      """All cells, computing those that haven't been computed yet at once"""
+      return list(zip(
+         [self._cells.labels[i] for i in self._indices],
+         self._cells.multiforms(self._indices)
+      ))
 
    def __getitem__(self, query:str) -> Table:
-      result = []
-      v = query.split()
-      for form_name, forms in self._data:
-         w = form_name.split()
-         if all(s in w for s in v):
-            result.append((form_name, forms))
+      # only the labels are needed to find the cells
+      found = self._cells.find(query.split())
+      if not self._has_all_cells:
+         found.intersection_update(self._indices)
       return Table(
          f"partial {self.pos}",
          TableCaption(
@@ -27,23 +106,25 @@ class Table:
             self.caption.subpar,
             f"{self.caption.caption} [{query}]"
          ),
-         result
+         self._cells,
+         sorted(found)
       )
 
    @property
    def multiform(self) -> List[str]: # TODO: document in README, rethink
-      if len(self._data) != 1:
+      if len(self._indices) != 1:
          raise AttributeError(
             "A 'Table' object has an attribute 'multiform' if and only if it has exactly one cell"
          )
-      return self._data[0][1]
+      return self._cells.multiforms(self._indices)[0]
 
    def __repr__(self) -> str:
       result = self.caption.full_caption + "\n"
-      name_widths = (len(form_name) for form_name, _ in self._data)
+      data = self._data
+      name_widths = (len(form_name) for form_name, _ in data)
       column_width = max(name_widths, default=0) + 5
-      if self._data:
-         for form_name, forms in self._data:
+      if data:
+         for form_name, forms in data:
             result += f"{form_name:{column_width}}{', '.join(forms)}\n"
       else:
          result += "Form not found\n"
@@ -53,13 +134,34 @@ class Table:
       return iter(self._data)
 
    def __len__(self) -> int:
-      return len(self._data)
+      return len(self._indices)
 
 class Multitable:
-   def __init__(self, input_word:str, tables:Iterator[Table]) -> None:
-      self._tables = list(tables)
+   """
+   The tables found for `input`. They are generated as they are needed:
+   `bool()`, indexing and iterating only generate as many tables as they
+   use, `len()` and `repr()` generate all of them.
+   """
+   __slots__ = ("_generated", "_pending", "input")
+
+   def __init__(self, input_word:str, tables:Iterable[Table]) -> None:
+      self._generated: List[Table] = []
+      self._pending: Optional[Iterator[Table]] = iter(tables)
       self.input = input_word
 
+   def _generate(self, n:Optional[int]=None) -> None:
+      """Generates tables until there are `n` of them (all of them if None)"""
+      while self._pending is not None and (n is None or len(self._generated) < n):
+         try:
+            self._generated.append(next(self._pending))
+         except StopIteration:
+            self._pending = None
+
+   @property
+   def _tables(self) -> List[Table]:
+      self._generate()
+      return self._generated
+
    def __repr__(self) -> str:
       if self._tables:
          return "\n".join(str(table) for table in self._tables)
@@ -67,19 +169,31 @@ class Multitable:
 
    def __getitem__(self, query:Union[int, str]) -> Union[Multitable, Table]:
       if isinstance(query, int):
-         return self._tables[query]
+         self._generate(query + 1 if query >= 0 else None)
+         return self._generated[query]
       else:
-         n_tables = len(self._tables)
+         self._generate(2) # enough to know if there is more than one table
+         n_tables = len(self._generated)
          if n_tables == 0:
             raise ValueError("You can't index an empty multitable")
          elif n_tables == 1:
             return self[0][query]
          else:
             print("There's more than one table, consider using explicit indexing!", end="\n\n")
-            return Multitable(self.input, (table[query] for table in self._tables))
+            return Multitable(self.input, (table[query] for table in self))
+
+   def __iter__(self) -> Iterator[Table]:
+      i = 0
+      while True:
+         self._generate(i + 1)
+         if i >= len(self._generated):
+            return
+         yield self._generated[i]
+         i += 1
 
    def __len__(self) -> int:
       return len(self._tables)
 
    def __bool__(self) -> bool:
-      return bool(self._tables)
+      self._generate(1)
+      return bool(self._generated)
@@ -7,9 +7,10 @@ import re
 from typing import (
    Union, Optional, Callable, TypeVar,
    Iterator, Iterable, Sequence,
-   Pattern, Dict, List, Tuple
+   Pattern, Match, Dict, FrozenSet, List, Tuple, Any
 )
 from itertools import chain
+from .cache import CacheInfo, LRUCache
 from .charutils import (
    cring, cmacron, cstraight, cacute,
    cgrave, cdoublegrave, ccircumflex,
@@ -83,19 +84,18 @@ def insert(word:str, position_to_accent:Dict[int, str]) -> str:
    if not position_to_accent:
       return word
 
-   keys = sorted(position_to_accent.keys())
+   if len(position_to_accent) == 1: # the usual case
+      (position, accent), = position_to_accent.items()
+      return word[:position] + accent + word[position:]
 
-   def pieces() -> Iterator[str]:
-      yield word[:keys[0]]
-
-      for i in range(1, len(keys)):
-         yield position_to_accent[keys[i-1]]
-         yield word[keys[i-1]:keys[i]]
-
-      yield position_to_accent[keys[-1]]
-      yield word[keys[-1]:]
-
-   return ''.join(pieces())
+   pieces = []
+   start = 0
+   for position in sorted(position_to_accent):
+      pieces.append(word[start:position])
+      pieces.append(position_to_accent[position])
+      start = position
+   pieces.append(word[start:])
+   return ''.join(pieces)
 
 def palatalize(sequence:str, mode: str='') -> str:
    idict = palatalization_modes[mode]
@@ -250,27 +250,192 @@ _prettify_yer_yot = (
    ('лĵ', 'љ'),('нĵ', 'њ'), ('јĵ', 'ј'), ('ĵ', 'ј')
 )
 
-def prettify(text:str, yat:str="e") -> str:
-   other_repl_modes = (
-      _prettify_small_palatalization_c,
-      _prettify_replaces_c,
-      _prettify_yat_replaces_c[yat]
-   )
+# `prettify` applies the rules above one after another. To make fewer passes
+# over the text, they are compiled into a `_Rewriter`: consecutive rules that
+# only replace fixed strings and provably don't interact are merged into one
+# regex with alternatives, and the other rules are skipped when the text
+# lacks a character without which they can't match.
+
+_Rule = Tuple[str, str, bool] # pattern, replacement, whether it's a regex
+
+_regex_special_chars = "\\.^$*+?{}[]|()"
 
-   for entity in _prettify_big_palatalization_c:
-      text = entity[0].sub(entity[1], text)
+def _rule_literals(pattern:str, repl:str, is_regex:bool) -> Optional[List[str]]:
+   """
+   If the rule only replaces fixed strings, returns them, e.g. ['кȷ', 'цȷ']
+   for '[кц]ȷ'. Otherwise (groups, quantifiers, backreferences...) None.
+   """
+   if not is_regex:
+      return [pattern]
+   if "\\" in repl:
+      return None
+   result = [""]
+   i = 0
+   while i < len(pattern):
+      if pattern[i] == "[":
+         end = pattern.find("]", i)
+         chars = pattern[i+1:end]
+         if end == -1 or any(c in chars for c in "^-\\"):
+            return None
+         i = end + 1
+      elif pattern[i] in _regex_special_chars:
+         return None
+      else:
+         chars = pattern[i]
+         i += 1
+      result = [literal + char for literal in result for char in chars]
+   return result
+
+def _independent(earlier:Tuple[str, str], later:str) -> bool:
+   """
+   Whether replacing the fixed string `earlier[0]` with `earlier[1]` and then
+   `later` with something gives the same as replacing both at once.
+   This is the case if (1) their occurrences can only overlap if `later` is
+   inside `earlier`, so that both ways replace the same occurrences, and
+   (2) replacing `earlier` can't create new occurrences of `later`.
+   """
+   old, new = earlier
+   if old in later:
+      return False
+   for n in range(1, min(len(old), len(later))):
+      if old.endswith(later[:n]) or later.endswith(old[:n]):
+         return False
+   # (2) is guaranteed if `later` can't contain any character of `new`;
+   # if `new` is empty, removing `old` can join what was around it
+   return bool(new) and not any(char in later for char in new)
+
+def _required_chars(pattern:str) -> str:
+   """
+   Characters that every match of the regex `pattern` contains:
+   those outside of groups and classes that aren't made optional.
+   """
+   if "\\" in pattern:
+      return ""
+   result = []
+   depth = 0
+   i = 0
+   while i < len(pattern):
+      char = pattern[i]
+      if char == "[":
+         i = pattern.find("]", i) + 1
+         continue
+      if char == "(":
+         depth += 1
+      elif char == ")":
+         depth -= 1
+      elif char == "|" and depth == 0:
+         return "" # a choice between whole patterns
+      elif depth == 0 and char not in _regex_special_chars:
+         if i + 1 >= len(pattern) or pattern[i+1] not in "?*{":
+            result.append(char)
+      i += 1
+   return "".join(result)
+
+# the characters of ordinary words, see `_trigger`
+_common_chars = frozenset("абвгдђежзијклљмнњопрстћуфхцчџш" + cstraight + cmacron)
+
+def _trigger(chars:str) -> str:
+   """
+   One of `chars` (all of which a match contains) that is
+   as rare as possible, so that checking for it skips most texts.
+   """
+   rare = [char for char in chars if char not in _common_chars]
+   return (rare or list(chars))[0]
 
-   for old, new in _prettify_simple_palatalization:
-      text = text.replace(old, new)
+_Pass = Tuple[FrozenSet[str], Pattern, Union[str, Callable[[Match], str]], FrozenSet[str]]
 
-   for repl_mode in other_repl_modes:
-      for entity in repl_mode:
-         text = entity[0].sub(entity[1], text)
+class _Rewriter:
+   """
+   Applies `rules` one after another, with the same result as applying
+   them one by one with re.sub or str.replace.
+
+   Every pass is skipped if the text contains none of its triggers.
+   Passes are also grouped into chunks, and a chunk is skipped at once
+   if the text contains none of the triggers of its passes. Which characters
+   the text contains is only calculated once, after that we just add
+   the characters that a pass can insert.
+   """
+   chunk_size = 8
+
+   def __init__(self, rules:Sequence[_Rule]) -> None:
+      passes: List[_Pass] = [] # (triggers, regex, replacement, inserted characters)
+      group: List[Tuple[str, str]] = [] # fixed strings and their replacements
+
+      def flush() -> None:
+         if not group:
+            return
+         table = dict(group)
+         # the alternatives are tried in order, so a string that is inside another
+         # one (e.g. 'лȷ' inside 'слȷ') only matches where the longer one doesn't
+         passes.append((
+            frozenset(_trigger(old) for old, _ in group),
+            re.compile("|".join(re.escape(old) for old, _ in group)),
+            lambda match: table[match.group()],
+            frozenset("".join(table.values()))
+         ))
+         group.clear()
+
+      for pattern, repl, is_regex in rules:
+         literals = _rule_literals(pattern, repl, is_regex)
+         if literals is None:
+            flush()
+            required = _required_chars(pattern)
+            # no triggers means that the pass is never skipped
+            triggers = frozenset(_trigger(required)) if required else frozenset()
+            # (backreferences only insert characters that are already there)
+            passes.append((triggers, re.compile(pattern), repl, frozenset(repl)))
+         else:
+            if not all(_independent(e, literal) for e in group for literal in literals):
+               flush()
+            group += [(literal, repl) for literal in literals]
+      flush()
+
+      self._chunks: List[Tuple[FrozenSet[str], List[_Pass]]] = []
+      for i in range(0, len(passes), self.chunk_size):
+         chunk = passes[i:i+self.chunk_size]
+         if all(triggers for triggers, *_ in chunk):
+            chunk_triggers = frozenset().union(*(triggers for triggers, *_ in chunk))
+         else:
+            chunk_triggers = frozenset()
+         self._chunks.append((chunk_triggers, chunk))
+
+   def __call__(self, text:str) -> str:
+      chars = set(text)
+      for chunk_triggers, chunk in self._chunks:
+         if chunk_triggers and chars.isdisjoint(chunk_triggers):
+            continue
+         for triggers, pattern, repl, inserted in chunk:
+            if triggers and chars.isdisjoint(triggers):
+               continue
+            text = pattern.sub(repl, text)
+            chars |= inserted
+      return text
+
+   def __len__(self) -> int:
+      """The number of passes"""
+      return sum(len(chunk) for _, chunk in self._chunks)
+
+def _prettify_rules(yat:str) -> List[_Rule]:
+   """All rules of `prettify` in the order they are applied"""
+   def regexes(replaces:Iterable[Tuple[str, str]]) -> List[_Rule]:
+      return [(p, r, True) for p, r in replaces]
+   def literals(replaces:Iterable[Tuple[str, str]]) -> List[_Rule]:
+      return [(p, r, False) for p, r in replaces]
+   return (
+      regexes(_prettify_big_palatalization) +
+      literals(_prettify_simple_palatalization) +
+      regexes(_prettify_small_palatalization) +
+      regexes(_prettify_replaces) +
+      regexes(_prettify_yat_replaces[yat]) +
+      literals(_prettify_yer_yot)
+   )
 
-   for old, new in _prettify_yer_yot:
-      text = text.replace(old, new)
+_prettify_rewriters: Dict[str, _Rewriter] = {
+   yat: _Rewriter(_prettify_rules(yat)) for yat in _prettify_yat_replaces
+}
 
-   return text
+def prettify(text:str, yat:str="e") -> str:
+   return _prettify_rewriters[yat](text)
 
 _deaccentize_accented: Dict[str, str] = {
    'ȁȃâáàā': 'a', 'ȅȇêéèē': 'e', 'ȉȋîíìīĭ': 'i',
@@ -298,7 +463,7 @@ _garde_translator = str.maketrans({
 def garde(word: str) -> str: # Garde's accentuation
    result = word
    accents_re = _garde_four_accents_c
-   while accents_re.findall(result): # while word is ungarded-like:
+   while accents_re.search(result): # while word is ungarded-like:
 
       short_desc_index = result.rfind(cdoublegrave)
       long_desc_index = result.rfind(ccircumflex)
@@ -311,40 +476,33 @@ def garde(word: str) -> str: # Garde's accentuation
          short_desc_index in (fvi + 1, -1) and
          long_desc_index in (fvi + 1, -1)
       ):
-         word2 = result
+         chars = list(result)
          insert_bool = False
          insert_dict = {}
          # which means: for each letter, if the letter is a vowel, we take the next symbol,
          # change it to '•' and insert a straight accent afther the next vowel;
          # not sure how it works on 2 consecutive accents,
          # so if you know such a word please tell us
-         for i, letter in enumerate(word2):
-
-            if letter in all_vowels:
-               if insert_bool:
-                  insert_dict[i+1] = cstraight
-                  insert_bool = False
-               else:
-                  if len(result) > i+1:
-                     # TODO: May benefit from precompiling regexes
-                     # (or from remaking the transformation in other terms?)
-                     if result[i+1] == cgrave:
-                        insert_bool = True
-                        word2 = re.sub("^(.{" + str(i+1) + "}).", r"\g<1>" + '•', word2)
-                     elif result[i+1] == cacute:
-                        insert_bool = True
-                        word2 = re.sub("^(.{" + str(i+1) + "}).", r"\g<1>" + cmacron, word2)
-                     elif result[i+1] == cdoublegrave:
-                        word2 = re.sub("^(.{" + str(i+1) + "}).",
-                                       r"\g<1>" + cstraight,
-                                       word2)
-                     elif result[i+1] == ccircumflex:
-                        word2 = re.sub("^(.{" + str(i+1) + "}).",
-                                       r"\g<1>" + cstraight,
-                                       word2)
-                        insert_dict[i+1] = cmacron
-
-         word3 = insert(word2, insert_dict)
+         # (only vowels matter, so we let the regex engine find them)
+         for vowel in _any_vowel_c.finditer(result):
+            i = vowel.start()
+            if insert_bool:
+               insert_dict[i+1] = cstraight
+               insert_bool = False
+            elif len(result) > i+1:
+               if result[i+1] == cgrave:
+                  insert_bool = True
+                  chars[i+1] = '•'
+               elif result[i+1] == cacute:
+                  insert_bool = True
+                  chars[i+1] = cmacron
+               elif result[i+1] == cdoublegrave:
+                  chars[i+1] = cstraight
+               elif result[i+1] == ccircumflex:
+                  chars[i+1] = cstraight
+                  insert_dict[i+1] = cmacron
+
+         word3 = insert(''.join(chars), insert_dict)
          word3 = swap(word3.replace('•', ''), cstraight, cmacron)
          result = word3
 
@@ -487,20 +645,141 @@ expose_transform: _Transform[str] = compose1(
    deancientify
 )
 
+def _expose_replacement(form:str, yat:str, latin:bool) -> str:
+   for k, v in _prettify_yat_replaces_c[yat]:
+      form = k.sub(v, form)
+   for q, w in real_accent.items():
+      form = form.replace(q, w)
+   return apply_yat_and_latin(form, yat, latin)
+
+# The same forms are exposed again and again (the same endings, stems shared
+# by many words, all cases of an indeclinable word...), so we remember the
+# results. These are set by `set_expose_cache_size`.
+expose_cache_size: Optional[int] = 1 << 14
+_expose_cache: LRUCache[Tuple[str, str, bool], str] = LRUCache(expose_cache_size)
+_expose_replacement_cache: LRUCache[Tuple[str, str, bool], str] = LRUCache(expose_cache_size)
+
+def set_expose_cache_size(maxsize:Optional[int]) -> None:
+   """
+   Sets how many results `expose` and `expose_replacement` remember (each).
+   0 turns remembering off, None means no limit. Clears the caches.
+   """
+   global expose_cache_size, _expose_cache, _expose_replacement_cache
+   expose_cache_size = maxsize
+   _expose_cache = LRUCache(maxsize)
+   _expose_replacement_cache = LRUCache(maxsize)
+
+def expose_cache_info() -> Dict[str, CacheInfo]:
+   """Hits, misses and sizes of the caches"""
+   return {
+      "expose": _expose_cache.cache_info(),
+      "expose_replacement": _expose_replacement_cache.cache_info()
+   }
+
 def expose(form:str, yat:str="e", latin:bool=False) -> str:
    """
    all transformations from internal to external representation;
    ijekavian two-syllable yat appears only here, not in yat_replaces,
    otherwise ungarde() produces wrong results, i.e. **snìjeg
    """
-   return expose_transform(form, yat=yat, latin=latin)
+   key = (form, yat, latin)
+   result = _expose_cache.get(key)
+   if result is None:
+      result = _expose_cache[key] = expose_transform(form, yat=yat, latin=latin)
+   return result
 
 def expose_replacement(form:str, yat:str="e", latin:bool=False) -> str:
-   for k, v in _prettify_yat_replaces_c[yat]:
-      form = k.sub(v, form)
-   for q, w in real_accent.items():
-      form = form.replace(q, w)
-   return apply_yat_and_latin(form, yat, latin)
+   key = (form, yat, latin)
+   result = _expose_replacement_cache.get(key)
+   if result is None:
+      result = _expose_replacement_cache[key] = _expose_replacement(form, yat, latin)
+   return result
+
+# Most stages of `expose_transform` only replace substrings that never
+# contain a line break. Such stages can be applied to many forms joined with
+# line breaks at once, which is much faster than applying them to every form
+# separately. The others have to be applied form by form.
+_expose_many_sentinel = "\n"
+
+_expose_many_stages: List[Tuple[Callable[..., str], Sequence[str], bool]] = [
+   # (stage, keyword arguments it needs, whether it can be applied to joined forms)
+   (deancientify, (), True),
+   (decurlyerify, (), True),
+   (deyerify, (), False),
+   (debracketify, (), False),
+   (zeroify, (), False),
+   (purify, (), True),
+   (prettify, ("yat",), True),
+   (ungarde, (), False),
+   (apply_yat_and_latin, ("yat", "latin"), True)
+]
+
+# The stages before the first one that needs `yat` give the same result for
+# all yat modes, so when we need several yat modes, we only fork after them.
+_expose_fork = next(i for i, (_, kws, _) in enumerate(_expose_many_stages) if "yat" in kws)
+
+def _expose_joined(
+   text:str,
+   stages:Sequence[Tuple[Callable[..., str], Sequence[str], bool]],
+   all_kwargs:Dict[str, Any]
+) -> str:
+   """Applies `stages` to forms joined with _expose_many_sentinel"""
+   for stage, kws, joinable in stages:
+      kwargs = {kw: all_kwargs[kw] for kw in kws}
+      if joinable:
+         text = stage(text, **kwargs)
+      else:
+         text = _expose_many_sentinel.join(
+            stage(form, **kwargs) for form in text.split(_expose_many_sentinel)
+         )
+   return text
+
+def expose_many_yats(
+   forms:Iterable[str],
+   yats:Sequence[str]=("e", "je", "ije"),
+   latin:bool=False
+) -> Dict[str, List[str]]:
+   """
+   `expose_many` for several yat modes at once, e.g. {"e": [...], "ije": [...]}.
+   The stages that don't depend on the yat mode are only applied once.
+   """
+   forms = list(forms)
+   results = {yat: [_expose_cache.get((form, yat, latin)) for form in forms] for yat in yats}
+   missing = list(dict.fromkeys(
+      form for yat in yats for form, result in zip(forms, results[yat]) if result is None
+   ))
+   new_results: Dict[str, Dict[str, str]] = {yat: {} for yat in yats}
+   if any(_expose_many_sentinel in form for form in missing):
+      for yat in yats:
+         new_results[yat] = {
+            form: expose_transform(form, yat=yat, latin=latin) for form in missing
+         }
+   elif missing:
+      neutral = _expose_joined(
+         _expose_many_sentinel.join(missing), _expose_many_stages[:_expose_fork], {}
+      )
+      for yat in yats:
+         exposed = _expose_joined(
+            neutral, _expose_many_stages[_expose_fork:], {"yat": yat, "latin": latin}
+         )
+         new_results[yat] = dict(zip(missing, exposed.split(_expose_many_sentinel)))
+   for yat in yats:
+      for form, result in new_results[yat].items():
+         _expose_cache[(form, yat, latin)] = result
+   return {
+      yat: [
+         new_results[yat][form] if result is None else result
+         for form, result in zip(forms, results[yat])
+      ]
+      for yat in yats
+   }
+
+def expose_many(forms:Iterable[str], yat:str="e", latin:bool=False) -> List[str]:
+   """
+   The same as `[expose(form, yat, latin) for form in forms]`, but faster
+   for many forms, e.g. for a whole paradigm.
+   """
+   return expose_many_yats(forms, (yat,), latin)[yat]
 
 
 def strip_suffix(value:str, suffixes:Iterable[str]) -> Tuple[str, bool]:
@@ -1,9 +1,8 @@
 from typing import Dict, List, Iterator, Optional, Tuple
-from ..pos import PartOfSpeech, Replacement
-from ..utils import insert, garde, expose, last_vowel_index, expose_replacement
-from ..paradigm_helpers import AccentedTuple, uniq, nice_name, oa, accentize
-from .paradigms import MP_to_verb_stems
-from ..table import LabeledMultiform
+from ..pos import PartOfSpeech, RawMultiform, Replacement
+from ..utils import insert, garde, last_vowel_index
+from ..paradigm_helpers import AccentedTuple, LabelFilter, oa, accentize
+from .paradigms import compiled_verb_endings
 
 infinitive_dict: Dict[str, str] = {
    'alpha': 'ити', 'beta': 'ати', 'gamma': 'нути',
@@ -13,6 +12,8 @@ infinitive_dict: Dict[str, str] = {
 }
 
 class Verb(PartOfSpeech):
+   __slots__ = ("is_reflexive", "trunk", "trunk2")
+
    def __init__(
       self,
       key:str,
@@ -36,14 +37,9 @@ class Verb(PartOfSpeech):
       return True
 
    # Verb-specific
-   def _expose(self, form:str, yat:str="e", latin:bool=False) -> str:
-      form = expose(form, yat, latin)
-      if self.is_reflexive:
-         if latin:
-            form += ' se'
-         else:
-            form += ' се'
-      return form
+   def _exposed_suffix(self) -> str:
+      return ' се' if self.is_reflexive else ''
+
 
    # Verb-specific
    def _trunk(self) -> List[str]:
@@ -104,52 +100,39 @@ class Verb(PartOfSpeech):
       self,
       i:int,
       length_inconstancy:bool,
-      yat:str="e",
-      latin:bool=False
-   ) -> Iterator[LabeledMultiform]:
+      wanted:LabelFilter=LabelFilter()
+   ) -> Iterator[RawMultiform]:
       # TODO: length_inconstancy currently not used
       # however, Svetozar says he will use it later
       # e.g. гри̏сти, гри́зе̄м
-      for label, ending in MP_to_verb_stems[self.gram.MP[i]].labeled_endings:
+      for label, name, chains in compiled_verb_endings(self.gram.MP[i], self.gram.AP[i]):
+
+         if not wanted(name):
+            continue
 
-         if label in self.replacements:
-            result = [
-               expose_replacement(w_form, yat, latin)
-               for w_form in self.replacements[label]
-            ]
-            yield nice_name(label), uniq(result)
+         elif label in self.replacements:
+            yield RawMultiform(name, [], [], self.replacements[label])
 
          else:
             if self._verb_form_is_possible(label, self.gram.other):
                ready_forms: List[str] = []
-               for variation in ending:
+               for variation in chains:
                   ready_forms += self.process_one_form(
-                     self.gram.AP[i], self._current_trunk(i, label), variation)
+                     self.gram.AP[i], self._current_trunk(i, label), variation.morphemes)
 
-               if label in self.amendments:
-                  ready_forms += [
-                     expose_replacement(w_form, yat, latin)
-                     for w_form in self.amendments[label]
-                  ]
-               result = [
-                  self._expose(w_form, yat, latin)
-                  for w_form in ready_forms
-               ]
-               yield nice_name(label), uniq(result)
+               yield RawMultiform(name, ready_forms, self.amendments.get(label, []))
 
 
-   def multiforms(
+   def _raw_multiforms(
       self,
-      *,
       variant:Optional[int]=None,
-      yat:str="e",
-      latin:bool=False
-   ) -> Iterator[LabeledMultiform]:
+      wanted:LabelFilter=LabelFilter()
+   ) -> Iterator[RawMultiform]:
       """conjugate"""
       for i, AP in enumerate(self.gram.AP):
          if self.gram.MP[i] in infinitive_dict:
             if not (variant is not None and variant != i):
-               yield from self._paradigm_to_forms(i, False, yat, latin)
+               yield from self._paradigm_to_forms(i, False, wanted)
 
          else:
             raise NotImplementedError(
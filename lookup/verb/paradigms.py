@@ -1,6 +1,7 @@
-from typing import Dict, Iterator, NamedTuple, List
-from ..paradigm_helpers import (AccentedTuple, nice_name,
-                                MorphemeChain, LabeledEnding)
+from functools import lru_cache
+from typing import Dict, Iterator, NamedTuple, List, Tuple
+from ..paradigm_helpers import (AccentedTuple, nice_name, compile_endings,
+                                CompiledEnding, MorphemeChain, LabeledEnding)
 from ..charutils import cmacron
 
 class Present(NamedTuple):
@@ -386,3 +387,7 @@ MP_to_verb_stems: Dict[str, Stems] = dict(
    kappa2=Stems(e_present, zero_past),
    kappa3=Stems(e3_present, zero3_past)
 )
+
+@lru_cache(maxsize=None)
+def compiled_verb_endings(MP:str, AP:str) -> Tuple[CompiledEnding, ...]:
+   return compile_endings(MP_to_verb_stems[MP].labeled_endings, AP)
@@ -12,6 +12,42 @@ function onSubmit (event) {
    event.preventDefault();
 }
 
+var suggestTimeout = null,
+    suggestRequest = 0;
+
+function showSuggestions (words) {
+   var datalist = document.getElementById("suggestions");
+   datalist.innerHTML = "";
+   for (word of words) {
+      var option = document.createElement("option");
+      option.value = word;
+      datalist.appendChild(option);
+   }
+}
+
+function requestSuggestions () {
+   var word = document.getElementById("word").value.trim(),
+       inputYat = document.querySelector("input[name=in]:checked").value,
+       thisRequest = ++suggestRequest;
+   if (!word) {
+      showSuggestions([]);
+      return;
+   }
+   fetch($SCRIPT_ROOT + "/suggest?q=" + encodeURIComponent(word) + "&in=" + inputYat)
+      .then(function (response) { return response.json(); })
+      .then(function (words) {
+         // answers can arrive out of order, only show the latest one
+         if (thisRequest === suggestRequest) showSuggestions(words);
+      })
+      .catch(function () {}); // suggestions are optional, searching still works
+}
+
+function onInput () {
+   // wait until the user stops typing for a moment
+   clearTimeout(suggestTimeout);
+   suggestTimeout = setTimeout(requestSuggestions, 150);
+}
+
 function insertString (s) {
    var input = document.getElementById("word"),
        backup = { start: input.selectionStart, end: input.selectionEnd };
@@ -21,10 +57,12 @@ function insertString (s) {
    input.selectionStart = backup.start + s.length;
    input.selectionEnd = backup.end + s.length;
    input.focus();
+   onInput();
 }
 
 function setup () {
    document.getElementById("search").addEventListener("submit", onSubmit);
+   document.getElementById("word").addEventListener("input", onInput);
    
    for (button of document.querySelectorAll("#options [type=button]")) {
       button.addEventListener("click", function () {
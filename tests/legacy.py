@@ -0,0 +1,96 @@
+"""
+Old, straightforward implementations of functions that have since been
+rewritten for speed. Tests compare the new implementations with these.
+"""
+
+import re
+from ..lookup.charutils import (
+   all_vowels, cacute, ccircumflex, cdoublegrave, cgrave, cmacron, cstraight
+)
+from ..lookup.utils import (
+   _garde_four_accents_c, _garde_translator, first_vowel_index, insert, swap,
+   _prettify_big_palatalization_c, _prettify_simple_palatalization,
+   _prettify_small_palatalization_c, _prettify_replaces_c,
+   _prettify_yat_replaces_c, _prettify_yer_yot
+)
+
+def prettify(text:str, yat:str="e") -> str:
+   other_repl_modes = (
+      _prettify_small_palatalization_c,
+      _prettify_replaces_c,
+      _prettify_yat_replaces_c[yat]
+   )
+
+   for entity in _prettify_big_palatalization_c:
+      text = entity[0].sub(entity[1], text)
+
+   for old, new in _prettify_simple_palatalization:
+      text = text.replace(old, new)
+
+   for repl_mode in other_repl_modes:
+      for entity in repl_mode:
+         text = entity[0].sub(entity[1], text)
+
+   for old, new in _prettify_yer_yot:
+      text = text.replace(old, new)
+
+   return text
+
+def garde(word: str) -> str: # Garde's accentuation
+   result = word
+   accents_re = _garde_four_accents_c
+   while accents_re.findall(result): # while word is ungarded-like:
+
+      short_desc_index = result.rfind(cdoublegrave)
+      long_desc_index = result.rfind(ccircumflex)
+      real_fvi = first_vowel_index(result)
+      fvi = real_fvi if real_fvi is not None else -100
+
+      # if not 'there is a falling accent and it is not of the first syllable'
+      # then the word is garded the usual way
+      if (
+         short_desc_index in (fvi + 1, -1) and
+         long_desc_index in (fvi + 1, -1)
+      ):
+         word2 = result
+         insert_bool = False
+         insert_dict = {}
+         # which means: for each letter, if the letter is a vowel, we take the next symbol,
+         # change it to '•' and insert a straight accent afther the next vowel;
+         # not sure how it works on 2 consecutive accents,
+         # so if you know such a word please tell us
+         for i, letter in enumerate(word2):
+
+            if letter in all_vowels:
+               if insert_bool:
+                  insert_dict[i+1] = cstraight
+                  insert_bool = False
+               else:
+                  if len(result) > i+1:
+                     # TODO: May benefit from precompiling regexes
+                     # (or from remaking the transformation in other terms?)
+                     if result[i+1] == cgrave:
+                        insert_bool = True
+                        word2 = re.sub("^(.{" + str(i+1) + "}).", r"\g<1>" + '•', word2)
+                     elif result[i+1] == cacute:
+                        insert_bool = True
+                        word2 = re.sub("^(.{" + str(i+1) + "}).", r"\g<1>" + cmacron, word2)
+                     elif result[i+1] == cdoublegrave:
+                        word2 = re.sub("^(.{" + str(i+1) + "}).",
+                                       r"\g<1>" + cstraight,
+                                       word2)
+                     elif result[i+1] == ccircumflex:
+                        word2 = re.sub("^(.{" + str(i+1) + "}).",
+                                       r"\g<1>" + cstraight,
+                                       word2)
+                        insert_dict[i+1] = cmacron
+
+         word3 = insert(word2, insert_dict)
+         word3 = swap(word3.replace('•', ''), cstraight, cmacron)
+         result = word3
+
+      else:
+         excl_index = max(short_desc_index, long_desc_index)
+         result = insert(result, {excl_index-1: '!'})
+         result = result.translate(_garde_translator)
+   return result
@@ -1,9 +1,27 @@
+import pickle
+import sys
 from typing import List
 import pytest # type: ignore
+import yaml
 from ..lookup import lookup, data
+from ..lookup.data.form_index import FormHit, build_form_index
+from ..lookup.data.entry_store import EntryStore, EntryStoreError, write_entry_store
+from ..lookup.data import (
+   build, diff, load_form_index, load_paradigm_store, parse, patch, read
+)
+from ..lookup.data.multidict import Entry, FancyLookup, Multidict
+from ..lookup.data.paradigm_store import write_paradigm_store
+from ..lookup.data.snapshot import (
+   SnapshotError, file_digest, load_snapshot, save_checked, save_snapshot
+)
+from ..lookup import pos, utils
+from . import legacy
 from ..lookup.charutils import four_accents, cmacron, roman
-from ..lookup.paradigm_helpers import cut_AP, has, str_find
+from ..lookup.paradigm_helpers import accentize, cut_AP, has, str_find
+from ..lookup.utils import garde
 from ..lookup.table import LabeledMultiform
+from ..lookup.noun.paradigms import c_m, compiled_c_m
+from ..lookup.paradigm_helpers import compile_endings
 
 
 first_form = {
@@ -81,3 +99,214 @@ def test_yaml_suffixes():
             cpt = entry.caption[0]
             assert ':' in cpt, [x[1].accented_keys for x in myentries]
             assert cpt[:cpt.find(':')] in roman, cpt+" "+entry.accented_keys
+
+
+def test_snapshot(tmp_path):
+   """Ensure that the snapshot gives back the same lookup and rejects stale data"""
+   path = str(tmp_path / "data.pickle")
+   save_snapshot(data.get(), path, "digest")
+   loaded = load_snapshot(path, "digest")
+   assert loaded._outer_to_inner._data == data._outer_to_inner._data
+   assert loaded._inner_to_entries._data == data._inner_to_entries._data
+   with pytest.raises(SnapshotError):
+      load_snapshot(path, "another digest")
+   with pytest.raises(SnapshotError):
+      load_snapshot(str(tmp_path / "nonexistent.pickle"), "digest")
+
+def test_multidict_bulk():
+   """Ensure that bulk insertion gives the same order as inserting one by one"""
+   pairs = [("a", 3), ("b", 1), ("a", 1), ("a", 3), ("b", 0), ("c", 2), ("a", 2)]
+   one_by_one = Multidict[str, int]()
+   for key, value in pairs:
+      one_by_one[key] = value
+   in_bulk = Multidict[str, int]()
+   with in_bulk.bulk():
+      for key, value in pairs:
+         in_bulk[key] = value
+   assert in_bulk._data == one_by_one._data == {"a": [1, 2, 3], "b": [0, 1], "c": [2]}
+
+def test_entry_store(tmp_path):
+   """Ensure that the entries read from disk are the same as the ones in memory"""
+   path = str(tmp_path / "data.entries")
+   entries = data.get()._inner_to_entries
+   write_entry_store(entries, path, "digest")
+   store = EntryStore(path, "digest", cache_size=2)
+   assert len(store) == len(entries)
+   for key in entries:
+      assert store[key] == entries[key]
+   assert store["абырвалг"] == []
+   assert store.types("свет") == tuple(e.type for e in entries["свет"])
+   assert store.types("абырвалг") == ()
+   assert pickle.loads(pickle.dumps(store))["свет"] == entries["свет"]
+   with pytest.raises(EntryStoreError):
+      EntryStore(path, "another digest")
+   # random keys by entry read only the chosen entry from disk
+   low_memory = FancyLookup()
+   low_memory._outer_to_inner = data.get()._outer_to_inner
+   low_memory._inner_to_entries = store = EntryStore(path, "digest")
+   low_memory.random_key("entry", {"V": 1})
+   assert store.cache_info().currsize == 1
+   # the file is replaced (e.g. rebuilt by another process) after the store is opened
+   store = EntryStore(path, "digest")
+   bigger = Multidict[str, Entry]()
+   bigger._data = {"а": entries["свет"], **entries._data}
+   write_entry_store(bigger, path, "another digest")
+   assert store["свет"] == entries["свет"]
+
+def test_form_index():
+   """Ensure that inflected forms lead to their lemmas in both scripts"""
+   index = build_form_index(data.get(), ["носити", "снꙓг"])
+   assert FormHit("носити", 0, 0, "prs 1 sg") in index["носим", "e"]
+   assert FormHit("носити", 0, 0, "prs 1 sg") in index["NOSIM", "ije"]
+   assert [hit.label for hit in index["снегом", "e"]] == ["sg ins"]
+   assert [hit.label for hit in index["снијегом", "ije"]] == ["sg ins"]
+   assert index["снијегом", "e"] == []
+   assert index["абырвалг", "e"] == []
+
+def test_built_later(monkeypatch, tmp_path):
+   """Ensure that an index or store built after the first use is picked up"""
+   module = sys.modules[load_form_index.__module__]
+   monkeypatch.setattr(module, "form_index_path", str(tmp_path / "forms.pickle"))
+   monkeypatch.setattr(module, "paradigm_store_path", str(tmp_path / "paradigms.sqlite"))
+   assert load_form_index()["носим", "e"] == []
+   assert load_paradigm_store() is None
+   digest = file_digest(module.file_path)
+   save_checked(build_form_index(data.get(), ["носити"]), module.form_index_path, digest)
+   write_paradigm_store(data.get(), module.paradigm_store_path, digest, ["носити"])
+   assert load_form_index()["носим", "e"]
+   store = load_paradigm_store()
+   assert store is not None and store.get("носити", 0, 0, "e")
+   assert load_paradigm_store() is store # opened only once
+
+def test_interning():
+   """Ensure that equal strings of the dictionary are stored only once"""
+   lookup = FancyLookup()
+   with lookup.bulk():
+      for inner_key, entry in parse(read()):
+         lookup[inner_key] = entry
+   entries = [e for inner_key in lookup._inner_to_entries for e in lookup.entries(inner_key)]
+   for values in (
+      [e.type for e in entries],
+      [e.caption for e in entries],
+      [outer_key for outer_key, _ in lookup._outer_to_inner],
+      [inner_key for key in lookup._outer_to_inner for inner_key in lookup._outer_to_inner[key]]
+   ):
+      assert len({id(value) for value in values}) == len(set(values))
+   # the snapshot keeps the sharing
+   loaded = pickle.loads(pickle.dumps(lookup))
+   assert len({id(e.info) for e in entries}) == len({
+      id(e.info) for inner_key in loaded._inner_to_entries for e in loaded.entries(inner_key)
+   })
+
+def test_patch():
+   """Ensure that patching the changed words gives the same as rebuilding"""
+   raw_data = read()
+   del raw_data["а¨бати"]
+   raw_data["адво`ка_т"] = {"t": "N\\m", "i": "b$/an", "c": "правник"}
+   raw_data["бла`бла"] = {"t": "N\\m", "i": "b$/an"}
+   current = data.get()
+   changes = diff(current, raw_data)
+   assert sorted(changes) == ["абати", "адвокат", "блабла"]
+   assert changes["абати"] == []
+   patched = patch(current, changes)
+   rebuilt = FancyLookup()
+   with rebuilt.bulk():
+      for inner_key, entry in parse(raw_data):
+         rebuilt[inner_key] = entry
+   assert patched._inner_to_entries._data == rebuilt._inner_to_entries._data
+   assert patched._outer_to_inner._data == rebuilt._outer_to_inner._data
+   assert list(current["абати", "e"]) # the original isn't modified
+   assert not list(patched["абати", "e"])
+   assert list(patched["blabla", "ije"])
+
+def test_parallel_build(tmp_path):
+   """Ensure that building in several processes gives the same as in one"""
+   raw_data = read()
+   yaml_path = tmp_path / "data.yml"
+   with open(yaml_path, "w", encoding="utf-8") as f:
+      yaml.safe_dump(dict(list(raw_data.items())[::20]), f, allow_unicode=True)
+   serial = build(str(yaml_path))
+   parallel = build(str(yaml_path), workers=3)
+   assert len(serial._inner_to_entries) > 100
+   assert parallel._inner_to_entries._data == serial._inner_to_entries._data
+   assert parallel._outer_to_inner._data == serial._outer_to_inner._data
+
+@pytest.mark.slow
+def test_expose_many(monkeypatch):
+   """Ensure that exposing whole paradigms at once doesn't change any form"""
+   def paradigms():
+      for inner_key in list(data._inner_to_entries)[::4]:
+         for entry in data.entries(inner_key):
+            POS = pos.part_of_speech(entry.type)
+            if POS is None:
+               continue
+            word = POS(
+               inner_key, entry.accented_keys, entry.type, entry.info,
+               entry.replacements, entry.amendments
+            )
+            for yat, latin in (("e", False), ("ije", True)):
+               yield list(word.multiforms(yat=yat, latin=latin))
+   default_size = utils.expose_cache_size
+   utils.set_expose_cache_size(0)
+   try:
+      batched = list(paradigms())
+      monkeypatch.setattr(pos, "expose_many_yats", lambda forms, yats, latin=False: {
+         yat: [utils.expose(form, yat, latin) for form in forms] for yat in yats
+      })
+      assert list(paradigms()) == batched
+   finally:
+      utils.set_expose_cache_size(default_size)
+
+@pytest.mark.slow
+def test_prettify(monkeypatch):
+   """Compare prettify with the old implementation on every form of every word"""
+   checked = 0
+   def checked_prettify(text:str, yat:str="e") -> str:
+      nonlocal checked
+      result = utils.prettify(text, yat)
+      assert result == legacy.prettify(text, yat), text
+      checked += 1
+      return result
+   monkeypatch.setattr(utils, "_expose_many_stages", [
+      (checked_prettify if f is utils.prettify else f, kws, joinable)
+      for f, kws, joinable in utils._expose_many_stages
+   ])
+   default_size = utils.expose_cache_size
+   utils.set_expose_cache_size(0)
+   try:
+      for inner_key in data._inner_to_entries:
+         for entry in data.entries(inner_key):
+            POS = pos.part_of_speech(entry.type)
+            if POS is None:
+               continue
+            word = POS(
+               inner_key, entry.accented_keys, entry.type, entry.info,
+               entry.replacements, entry.amendments
+            )
+            for yat in ("e", "je", "ije"):
+               list(word.multiforms(yat=yat))
+   finally:
+      utils.set_expose_cache_size(default_size)
+   assert checked > 1000
+
+def test_garde():
+   """Compare garde with the old implementation on every key in the dictionary"""
+   words = set()
+   for inner_key in data._inner_to_entries:
+      for entry in data.entries(inner_key):
+         for key in entry.accented_keys.split(",") + [entry.extra_key]:
+            if key:
+               words.update((accentize(key), accentize(key + "ø")))
+   assert len(words) > 1000
+   for word in words:
+      assert garde(word) == legacy.garde(word), word
+
+def test_compiled_endings():
+   """Compiled noun endings are cached by what they depend on, not by the stem"""
+   for stem in ("пријатељ", "отац", "кључ", "лавеж", "цар", "ковчег", "град"):
+      for suff, anim, AP in (("_", "in", "a."), ("+", "an", "c?"), ("±", "in", "b:")):
+         compiled = compile_endings(c_m(stem, suff, anim).labeled_endings, AP)
+         assert compiled_c_m(stem, suff, anim, AP) == compiled
+         # endings are never accented in a.
+         assert any(morpheme.accented for ending in compiled
+                    for chain in ending.chains for morpheme in chain.morphemes) == (AP != "a.")
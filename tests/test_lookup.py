@@ -1,6 +1,17 @@
+import sys
+import time
 import pytest # type: ignore
-from ..lookup import lookup
+from ..lookup import (
+   did_you_mean, lookup, lookup_all_yats, paradigm_cache_info, preload,
+   set_paradigm_cache_size, random_key, suggest, data
+)
+from ..lookup.data.form_index import build_form_index
+from ..lookup.data.multidict import FancyLookup
+from ..lookup.data.paradigm_store import ParadigmStore, ParadigmStoreError, write_paradigm_store
+from ..lookup.pos import PartOfSpeech, part_of_speech
 from ..lookup.charutils import cmacron
+from ..lookup.utils import cyr2lat
+from ..lookup.table import Multitable
 
 def test_nonsense():
    assert not lookup("абырвалг")
@@ -298,3 +309,193 @@ def test_poslova():
    assert {"о̏гње̄ва̄", "о̀гње̄ва̄"}.issubset(set(lookup("огањ")["gen pl"].multiform))
    assert "хр̥̏пто̄ва̄" not in set(lookup("хрбат")["gen pl"].multiform)
    assert {"о̀че̄ва̄", "ота́ца̄", "о̀та̄ца̄"} == set(lookup("отац")["gen pl"].multiform)
+
+def test_suggest():
+   assert suggest("свиј", input_yat="ije")[:2] == ["свијет", "свијетао"]
+   assert "свијет" not in suggest("свиј", input_yat="e")
+   assert suggest("sviJ", input_yat="je")[:2] == ["svijet", "svijetao"]
+   assert all(word.startswith("ре") for word in suggest("ре", limit=5))
+   assert len(suggest("ре", limit=5)) == 5
+   assert suggest("абырвалг") == []
+   assert suggest("  ") == []
+
+def test_did_you_mean():
+   preload() # builds the indices
+   assert did_you_mean("zvjezda", input_yat="ije")[0] == "zvijezda"
+   assert did_you_mean("kuca")[0] == "kuća"
+   assert "свијет" in did_you_mean("свјет", input_yat="je")
+   assert did_you_mean("абырвалг") == []
+   assert did_you_mean("а" * 100) == []
+
+def test_similar_in_background():
+   """Without `prepare_similar`, the first calls don't wait for the index"""
+   fresh = FancyLookup()
+   fresh._outer_to_inner = data.get()._outer_to_inner
+   start = time.perf_counter()
+   assert fresh.similar("kuca", "e", 5, 0.02) == []
+   assert time.perf_counter() - start < 0.1
+   for _ in range(200):
+      if fresh.similar("kuca", "e", 5, 0.02):
+         break
+      time.sleep(0.05)
+   assert fresh.similar("kuca", "e", 5, 0.02)[0] == "kuća"
+
+def test_inflected_forms(monkeypatch):
+   index = build_form_index(data.get(), ["носити", "адвокат"])
+   # `lookup` is both a subpackage and a function, so we find the former like this
+   monkeypatch.setattr(sys.modules[lookup.__module__], "load_form_index", lambda: index)
+   l = lookup("носим")
+   assert len(l) == 2
+   assert l[0].caption.full_caption.endswith("[prs 1 sg]")
+   assert l[0]["infinitive"].multiform == ["но̀сити"]
+   assert lookup("nosimo")[0].caption.full_caption.endswith("[prs 1 pl, imv 1 pl]")
+   assert not lookup("адвоката се")
+
+def test_random_key():
+   for _ in range(20):
+      assert lookup(*random_key())
+   for _ in range(20):
+      key, input_yat = random_key("entry", {"V": 1})
+      assert any(table.pos == "verb" for table in lookup(key, input_yat))
+   with pytest.raises(ValueError):
+      random_key("outer", {"V": 1})
+
+def test_paradigm_cache():
+   before = paradigm_cache_info()
+   first = repr(lookup("адвокат", "e", "ije"))
+   assert repr(lookup("адвокат", "e", "ije")) == first
+   after = paradigm_cache_info()
+   assert after.hits > before.hits
+   version, current = data.versioned()
+   data.swap(current) # as if the dictionary had been reloaded
+   assert data.versioned() == (version + 1, current)
+   misses = after.misses
+   assert repr(lookup("адвокат", "e", "ije")) == first
+   assert paradigm_cache_info().misses > misses
+
+def test_lookup_all_yats():
+   for key, input_yat in (("бео", "e"), ("бијел", "ije"), ("људи", "e"), ("абырвалг", "e")):
+      all_yats = lookup_all_yats(key, input_yat)
+      for yat in ("e", "je", "ije"):
+         assert repr(all_yats[yat]) == repr(lookup(key, input_yat, yat))
+
+def test_latin_shares_paradigm_cache():
+   cyrillic = repr(lookup("адвокат"))
+   misses = paradigm_cache_info().misses
+   latin = repr(lookup("advokat"))
+   assert paradigm_cache_info().misses == misses
+   # the caption isn't transliterated
+   assert latin.splitlines()[1:] == cyr2lat(cyrillic).splitlines()[1:]
+
+def test_lazy_table(monkeypatch):
+   set_paradigm_cache_size(16 << 20) # clears the cache
+   # not taken from the precomputed paradigms if they have been built
+   monkeypatch.setattr(sys.modules[lookup.__module__], "load_paradigm_store", lambda: None)
+   table = lookup("адвокат")[0]
+   assert len(table) == 14
+   assert table["sg nom"].multiform == ["адво̀ка̄т"]
+   assert len(table._cells._multiforms) == 1 # only one cell has been exposed
+   full = repr(table)
+   # once the whole table is exposed, it is cached
+   hits = paradigm_cache_info().hits
+   assert repr(lookup("адвокат", lazy=False)[0]) == full
+   assert paradigm_cache_info().hits == hits + 1
+
+def test_table_queries():
+   table = lookup("носити", lazy=False)[0]
+   labels = [label for label, _ in table]
+   for query in ("", "prs", "prs 1", "sg 1 prs", "aor pl", "1 1", "nom", "prs  sg"):
+      expected = [label for label in labels if all(s in label.split() for s in query.split())]
+      assert [label for label, _ in table[query]] == expected
+      # a query of a partial table only finds its own cells
+      assert [label for label, _ in table["sg"][query]] == [
+         label for label in expected if "sg" in label.split()
+      ]
+
+def test_streaming_multitable():
+   generated = []
+   def tables():
+      for table in lookup("човек")._tables: # three tables
+         generated.append(table)
+         yield table
+   multitable = Multitable("човек", tables())
+   assert multitable and len(generated) == 1
+   assert multitable[1] is generated[1] and len(generated) == 2
+   assert next(iter(multitable)) is generated[0] and len(generated) == 2
+   assert len(multitable) == len(generated) == 3
+   assert list(multitable) == generated
+   assert not Multitable("", iter([]))
+
+@pytest.mark.parametrize("word", ["носити", "човек", "жена", "зелен"])
+def test_selected_forms(monkeypatch, word):
+   queries = ["sg gen", "pl gen", "infinitive", "prs 1"]
+   monkeypatch.setattr(sys.modules[lookup.__module__], "load_paradigm_store", lambda: None)
+   set_paradigm_cache_size(0) # generated, not filtered from the cache
+   selected = [list(table) for table in lookup(word, forms=queries)]
+   set_paradigm_cache_size(16 << 20)
+   full = lookup(word, lazy=False)
+   assert selected == [
+      [(label, forms) for label, forms in table if any(
+         set(query.split()) <= set(label.split()) for query in queries
+      )]
+      for table in full
+   ]
+   assert any(selected)
+   # now the full paradigms are cached
+   assert [list(table) for table in lookup(word, forms=queries)] == selected
+
+def test_paradigm_store(monkeypatch, tmp_path):
+   """Ensure that the stored paradigms give the same tables as the engine"""
+   words = ["носити", "човек", "бео", "жена"]
+   expected = {
+      (word, yat, latin): [repr(table) for table in lookup(cyr2lat(word) if latin else word, "e", yat)]
+      for word in words for yat in ("e", "je", "ije") for latin in (False, True)
+   }
+   path = str(tmp_path / "paradigms.sqlite")
+   inner_keys = {word: list(dict.fromkeys(inner_key for inner_key, _ in data[word, "e"])) for word in words}
+   write_paradigm_store(
+      data.get(), path, "digest", inner_keys["носити"] + inner_keys["човек"] + inner_keys["бео"]
+   )
+   store = ParadigmStore(path, "digest")
+   monkeypatch.setattr(sys.modules[lookup.__module__], "load_paradigm_store", lambda: store)
+   set_paradigm_cache_size(0)
+   generated = []
+   raw_multiforms = PartOfSpeech.raw_multiforms
+   def spy(self, *args, **kwargs):
+      generated.append(self.key)
+      return raw_multiforms(self, *args, **kwargs)
+   monkeypatch.setattr(PartOfSpeech, "raw_multiforms", spy)
+   try:
+      for (word, yat, latin), tables in expected.items():
+         assert [
+            repr(table) for table in lookup(cyr2lat(word) if latin else word, "e", yat)
+         ] == tables
+   finally:
+      set_paradigm_cache_size(16 << 20)
+   assert set(generated) == set(inner_keys["жена"]) # it isn't in the store
+   with pytest.raises(ParadigmStoreError):
+      ParadigmStore(path, "another digest")
+   with pytest.raises(ParadigmStoreError):
+      ParadigmStore(str(tmp_path / "nonexistent.sqlite"), "digest")
+
+def test_no_instance_dicts():
+   """The objects created for every lookup are slotted"""
+   multitable = lookup("адвокат", lazy=False)
+   table = multitable[0]
+   for obj in (multitable, table, table._cells, table.caption):
+      assert not hasattr(obj, "__dict__")
+   for word in ("адвокат", "носити", "зелен"):
+      inner_key, entry = next(data[word, "e"])
+      instance = part_of_speech(entry.type)(
+         inner_key, entry.accented_keys, entry.type, entry.info,
+         entry.replacements, entry.amendments
+      )
+      assert not hasattr(instance, "__dict__") and not hasattr(instance.gram, "__dict__")
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_tables_are_copies(lazy):
+   """Changing a table doesn't change the cached paradigm"""
+   set_paradigm_cache_size(16 << 20)
+   for _ in range(2): # the second time, the paradigm comes from the cache
+      lookup("адвокат", lazy=lazy)[0]["sg nom"].multiform.append("XXX")
+   assert lookup("адвокат", lazy=lazy)[0]["sg nom"].multiform == ["адво̀ка̄т"]
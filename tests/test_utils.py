@@ -1,4 +1,12 @@
-from ..lookup.utils import ungarde, garde, deyerify, insert, prettify, strip_suffix
+import random
+from ..lookup import utils
+from ..lookup.cache import LRUCache
+from ..lookup.charutils import cmacron, cring, cstraight
+from . import legacy
+from ..lookup.utils import (
+   ungarde, garde, deyerify, insert, prettify, strip_suffix, expose, expose_many,
+   expose_many_yats
+)
 
 def test_ungarde():
    assert [ungarde(i) for i in [
@@ -80,3 +88,57 @@ def test_strip_suffix():
    assert strip_suffix(s, [""]) == (s, True)
    assert strip_suffix(s, ["ggghi", "gghi", "ghi", "hi", "i"]) == ("abcdef", True)
    assert strip_suffix(s, []) == (s, False)
+
+def test_expose_cache():
+   default_size = utils.expose_cache_size
+   words = ["цꙓ̄лѣ\u030dти", "ви\u030dдѣʌ", "ви\u030dдѣʌ"]
+   utils.set_expose_cache_size(0)
+   uncached = [expose(word, "ije", latin) for word in words for latin in (False, True)]
+   utils.set_expose_cache_size(2)
+   try:
+      assert [expose(word, "ije", latin) for word in words for latin in (False, True)] == uncached
+      info = utils.expose_cache_info()["expose"]
+      assert (info.hits, info.misses, info.currsize) == (2, 4, 2)
+   finally:
+      utils.set_expose_cache_size(default_size)
+
+def test_expose_many():
+   words = [
+      "цꙓ̄лѣ\u030dти", "бѣлѣ\u030dжӣм", "ви\u030dдѣʌ", "ви\u030dдѣʌ",
+      "зајутрък", "0̍ка̄мен", "го>\u0304ст"
+   ]
+   for yat in ("e", "je", "ije"):
+      assert expose_many(words, yat, True) == [expose(word, yat, True) for word in words]
+   # line breaks are used to join forms, so such forms are exposed one by one
+   assert expose_many(["све̄т\nове", "ви\u030dдѣʌ"]) == ["све̄т\nове", "ви\u030fдео"]
+   assert expose_many([]) == []
+
+def test_expose_many_yats():
+   words = ["цꙓ̄лѣ\u030dти", "ви\u030dдѣʌ", "ви\u030dдѣʌ", "све̄т\nове"]
+   expose(words[0], "je") # some results are already cached, some are not
+   result = expose_many_yats(words)
+   assert list(result) == ["e", "je", "ije"]
+   for yat, exposed in result.items():
+      assert exposed == [expose(word, yat) for word in words]
+
+def test_prettify_random():
+   """Compare prettify with the old implementation on random strings"""
+   alphabet = "абвгдежзијклљмнњопрстћуфхцчџшђҵ" + "ȷʹʺ¦ĵѣꙓʌœӥʲ·" + cmacron + cring + cstraight
+   rng = random.Random(0)
+   for _ in range(5000):
+      text = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8)))
+      for yat in ("e", "je", "ije"):
+         assert prettify(text, yat) == legacy.prettify(text, yat), text
+
+def test_lru_cache():
+   cache: LRUCache[str, str] = LRUCache(maxsize=None, maxbytes=10, sizeof=len)
+   cache["a"] = "xxxx"
+   cache["b"] = "yyyy"
+   assert cache.get("a") == "xxxx" # now "b" is the least recently used
+   cache["c"] = "zzzz"
+   assert cache.get("b") is None
+   cache["d"] = "w" * 11 # too big to be cached at all
+   assert cache.get("d") is None
+   info = cache.cache_info()
+   assert (info.hits, info.misses, info.evictions) == (1, 2, 1)
+   assert (info.currsize, info.currbytes) == (2, 8)